@@ -1,11 +1,12 @@
 """Ceph command execution client."""
 
 import asyncio
-import json
 import logging
 import shlex
 from typing import Any, Dict, List, Tuple, Union
 
+import orjson
+
 from app.ceph.errors import (
     CephClusterUnavailable,
     CephCommandError,
@@ -78,22 +79,29 @@ class CephClient:
                 timeout=timeout_val,
             )
 
-            stdout = stdout_bytes.decode("utf-8").strip()
-            stderr = stderr_bytes.decode("utf-8").strip()
-
-            logger.debug(f"Command stdout: {stdout}")
-            if stderr:
-                logger.debug(f"Command stderr: {stderr}")
+            # JSON output is parsed straight from bytes (orjson ignores the
+            # surrounding whitespace); stdout and stderr are only decoded when
+            # returned as text, logged or reported in an error
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Command stdout: {stdout_bytes.decode('utf-8', 'replace')}")
+                if stderr_bytes.strip():
+                    logger.debug(f"Command stderr: {stderr_bytes.decode('utf-8', 'replace')}")
 
             if process.returncode != 0:
-                self._handle_error(process.returncode, stderr, stdout, command)
+                self._handle_error(
+                    process.returncode,
+                    stderr_bytes.decode("utf-8", "replace").strip(),
+                    stdout_bytes.decode("utf-8", "replace").strip(),
+                    command,
+                )
 
             if format_json:
-                if not stdout:
+                if not stdout_bytes or stdout_bytes.isspace():
                     return {}
                 try:
-                    return json.loads(stdout)
-                except json.JSONDecodeError as e:
+                    return orjson.loads(stdout_bytes)
+                except orjson.JSONDecodeError as e:
+                    stdout = stdout_bytes.decode("utf-8", "replace")
                     logger.error(f"Failed to parse JSON output: {stdout}")
                     raise CephCommandError(
                         message="Failed to parse Ceph command output",
@@ -101,7 +109,7 @@ class CephClient:
                         details={"output": stdout, "error": str(e)},
                     ) from e
 
-            return stdout
+            return stdout_bytes.decode("utf-8", "replace").strip()
 
         except asyncio.TimeoutError as e:
             logger.error(f"Command timed out after {timeout_val}s: {' '.join(cmd)}")
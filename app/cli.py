@@ -6,6 +6,9 @@ This CLI tool provides management commands for API keys and audit logs.
 """
 
 import argparse
+import hashlib
+import hmac
+import json
 import os
 import secrets
 import sqlite3
@@ -19,7 +22,6 @@ try:
     import bcrypt
     BCRYPT_AVAILABLE = True
 except ImportError:
-    import hashlib
     BCRYPT_AVAILABLE = False
 
 try:
@@ -49,6 +51,17 @@ VALID_PERMISSIONS = {
     "admin:*",
 }
 
+# Bytes of randomness in the plaintext lookup id embedded in each API key
+KEY_ID_BYTES = 8
+
+# Audit columns covered by each row's hash, in hashing order
+AUDIT_HASHED_COLUMNS = (
+    "timestamp", "api_key_prefix", "source_ip", "method", "endpoint",
+    "status_code", "response_time_ms", "user_agent", "error_message",
+)
+# prev_hash of the first chained audit row
+AUDIT_CHAIN_GENESIS = bytes(32)
+
 
 class Colors:
     """Color codes for terminal output."""
@@ -146,6 +159,27 @@ class ConfigManager:
         """Get maximum rate limit."""
         return self.config.get("security", {}).get("max_rate_limit", 1000)
 
+    def get_key_secret(self) -> Optional[str]:
+        """Get the server secret for HMAC key hashes, with environment variable override."""
+        return os.environ.get(
+            "CEPHX_KEY_SECRET",
+            self.config.get("security", {}).get("key_secret"),
+        )
+
+
+def expiry_epoch(expires_at: str) -> int:
+    """Convert an ISO expiration date to a UNIX timestamp; naive dates are UTC."""
+    expires_dt = datetime.fromisoformat(expires_at.replace('Z', '+00:00'))
+    if expires_dt.tzinfo is None:
+        expires_dt = expires_dt.replace(tzinfo=timezone.utc)
+    return int(expires_dt.timestamp())
+
+
+def audit_row_hash(prev_hash: bytes, values: Tuple[Any, ...]) -> bytes:
+    """Chain an audit row to its predecessor: sha256(prev_hash || canonical row)."""
+    canonical = json.dumps(list(values), separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(prev_hash + canonical.encode('utf-8')).digest()
+
 
 class DatabaseManager:
     """Manages SQLite database operations."""
@@ -184,11 +218,14 @@ class DatabaseManager:
                 CREATE TABLE IF NOT EXISTS api_keys (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     name TEXT NOT NULL UNIQUE,
+                    key_id TEXT,
                     key_hash TEXT NOT NULL,
+                    key_algo TEXT NOT NULL DEFAULT 'bcrypt',
                     permissions TEXT NOT NULL,
                     rate_limit INTEGER NOT NULL DEFAULT 60,
                     enabled INTEGER NOT NULL DEFAULT 1,
                     expires_at TEXT,
+                    expires_at_epoch INTEGER,
                     created_at TEXT NOT NULL,
                     last_used_at TEXT,
                     created_by TEXT,
@@ -210,22 +247,59 @@ class DatabaseManager:
                     user_agent TEXT,
                     request_size INTEGER,
                     response_size INTEGER,
-                    error_message TEXT
+                    error_message TEXT,
+                    prev_hash BLOB,
+                    row_hash BLOB
                 )
             """)
 
+            # Latest audit row_hash; a truncated or edited log no longer matches it
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS audit_chain_head (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    audit_id INTEGER NOT NULL,
+                    row_hash BLOB NOT NULL
+                )
+            """)
+
+            # Add columns to databases created before they existed
+            columns = {row['name'] for row in cursor.execute("PRAGMA table_info(api_keys)")}
+            if 'key_id' not in columns:
+                cursor.execute("ALTER TABLE api_keys ADD COLUMN key_id TEXT")
+            if 'key_algo' not in columns:
+                cursor.execute("ALTER TABLE api_keys ADD COLUMN key_algo TEXT NOT NULL DEFAULT 'bcrypt'")
+            if 'expires_at_epoch' not in columns:
+                cursor.execute("ALTER TABLE api_keys ADD COLUMN expires_at_epoch INTEGER")
+                rows = cursor.execute(
+                    "SELECT id, expires_at FROM api_keys WHERE expires_at IS NOT NULL"
+                ).fetchall()
+                cursor.executemany(
+                    "UPDATE api_keys SET expires_at_epoch = ? WHERE id = ?",
+                    [(expiry_epoch(row['expires_at']), row['id']) for row in rows]
+                )
+            columns = {row['name'] for row in cursor.execute("PRAGMA table_info(audit_log)")}
+            if 'row_hash' not in columns:
+                cursor.execute("ALTER TABLE audit_log ADD COLUMN prev_hash BLOB")
+                cursor.execute("ALTER TABLE audit_log ADD COLUMN row_hash BLOB")
+
             # Create indexes
             cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_api_keys_name ON api_keys(name)
             """)
+            cursor.execute("""
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_api_keys_key_id ON api_keys(key_id)
+            """)
             cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_api_keys_enabled ON api_keys(enabled)
             """)
             cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_audit_log_timestamp ON audit_log(timestamp)
             """)
+            # Serves "recent entries for key X"; replaces the single-column index
+            cursor.execute("DROP INDEX IF EXISTS idx_audit_log_api_key")
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_audit_log_api_key ON audit_log(api_key_prefix)
+                CREATE INDEX IF NOT EXISTS idx_audit_log_api_key_timestamp
+                ON audit_log(api_key_prefix, timestamp)
             """)
             cursor.execute("""
                 CREATE INDEX IF NOT EXISTS idx_audit_log_endpoint ON audit_log(endpoint)
@@ -242,25 +316,38 @@ class APIKeyManager:
         self.db = db
         self.config = config
 
-    @staticmethod
-    def hash_key(key: str) -> str:
-        """Hash an API key for storage."""
+    def hash_key(self, key: str) -> Tuple[str, str]:
+        """
+        Hash an API key for storage.
+
+        Generated keys are high-entropy, so with a server secret configured
+        an HMAC-SHA256 is as safe as bcrypt and far cheaper to verify.
+
+        Returns:
+            Tuple of (hash, algorithm name stored in key_algo)
+        """
+        secret = self.config.get_key_secret()
+        if secret:
+            digest = hmac.new(secret.encode('utf-8'), key.encode('utf-8'), hashlib.sha256)
+            return digest.hexdigest(), "hmac-sha256"
         if BCRYPT_AVAILABLE:
-            return bcrypt.hashpw(key.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-        else:
-            # Fallback to SHA-256 (less secure but no dependencies)
-            return hashlib.sha256(key.encode('utf-8')).hexdigest()
+            return bcrypt.hashpw(key.encode('utf-8'), bcrypt.gensalt()).decode('utf-8'), "bcrypt"
+        # Fallback to SHA-256 (less secure but no dependencies)
+        return hashlib.sha256(key.encode('utf-8')).hexdigest(), "sha256"
 
     @staticmethod
-    def generate_api_key(name: str) -> str:
+    def generate_api_key(name: str) -> Tuple[str, str]:
         """
-        Generate a new API key with format: {env}_{client}_{random20chars}
+        Generate a new API key with format: {env}_{client}_{key_id}_{random20chars}
+
+        The key_id (16 hex chars) is stored in plaintext so the server can find
+        the key's row with an index lookup and check a single bcrypt hash.
 
         Args:
             name: Name/description for the key
 
         Returns:
-            Generated API key string
+            Tuple of (generated API key string, key_id)
         """
         # Extract environment from name
         name_lower = name.lower()
@@ -281,11 +368,12 @@ class APIKeyManager:
         if not client:
             client = "client"
 
-        # Generate 20 random alphanumeric characters
+        # Generate the lookup id and 20 random alphanumeric characters
+        key_id = secrets.token_hex(KEY_ID_BYTES)
         alphabet = string.ascii_lowercase + string.digits
         random_part = ''.join(secrets.choice(alphabet) for _ in range(20))
 
-        return f"{env}_{client}_{random_part}"
+        return f"{env}_{client}_{key_id}_{random_part}", key_id
 
     def create_api_key(
         self,
@@ -321,18 +409,20 @@ class APIKeyManager:
             raise ValueError(f"Rate limit cannot exceed {max_limit}")
 
         # Generate API key
-        api_key = self.generate_api_key(name)
-        key_hash = self.hash_key(api_key)
+        api_key, key_id = self.generate_api_key(name)
+        key_hash, key_algo = self.hash_key(api_key)
 
         # Get current timestamp
         now = datetime.now(timezone.utc).isoformat()
 
         # Parse expiration if provided
         expires_at = None
+        expires_at_epoch = None
         if expires:
             try:
                 expires_dt = datetime.fromisoformat(expires.replace('Z', '+00:00'))
                 expires_at = expires_dt.isoformat()
+                expires_at_epoch = expiry_epoch(expires_at)
             except ValueError:
                 raise ValueError(f"Invalid expiration date format: {expires}")
 
@@ -342,14 +432,17 @@ class APIKeyManager:
             try:
                 cursor.execute("""
                     INSERT INTO api_keys
-                    (name, key_hash, permissions, rate_limit, enabled, expires_at, created_at, created_by, notes)
-                    VALUES (?, ?, ?, ?, 1, ?, ?, ?, ?)
+                    (name, key_id, key_hash, key_algo, permissions, rate_limit, enabled, expires_at, expires_at_epoch, created_at, created_by, notes)
+                    VALUES (?, ?, ?, ?, ?, ?, 1, ?, ?, ?, ?, ?)
                 """, (
                     name,
+                    key_id,
                     key_hash,
+                    key_algo,
                     ','.join(permissions),
                     rate_limit,
                     expires_at,
+                    expires_at_epoch,
                     now,
                     created_by,
                     notes,
@@ -454,8 +547,10 @@ class AuditLogManager:
             params = []
 
             if api_key_prefix:
-                query += " AND api_key_prefix LIKE ?"
-                params.append(f"{api_key_prefix}%")
+                # A range instead of LIKE so the index is used and '_' in keys
+                # is not a wildcard
+                query += " AND api_key_prefix >= ? AND api_key_prefix < ?"
+                params.extend([api_key_prefix, api_key_prefix + "\U0010ffff"])
 
             if endpoint:
                 query += " AND endpoint LIKE ?"
@@ -477,6 +572,42 @@ class AuditLogManager:
 
             return [dict(row) for row in rows]
 
+    def verify_chain(self) -> Tuple[int, Optional[int]]:
+        """Recompute the audit hash chain.
+
+        Rows written before the chain existed have no row_hash and are skipped.
+
+        Returns:
+            Number of chained rows checked and the id of the first row that
+            breaks the chain (0 if the head no longer matches), or None if intact
+        """
+        with self.db.get_connection() as conn:
+            head = conn.execute(
+                "SELECT audit_id, row_hash FROM audit_chain_head WHERE id = 1"
+            ).fetchone()
+            rows = conn.execute(
+                f"SELECT id, prev_hash, row_hash, {', '.join(AUDIT_HASHED_COLUMNS)} "
+                "FROM audit_log WHERE row_hash IS NOT NULL ORDER BY id"
+            )
+
+            checked = 0
+            prev_hash = AUDIT_CHAIN_GENESIS
+            last_id = None
+            for row in rows:
+                values = tuple(row[column] for column in AUDIT_HASHED_COLUMNS)
+                expected = audit_row_hash(prev_hash, values)
+                if row['prev_hash'] != prev_hash or row['row_hash'] != expected:
+                    return checked, row['id']
+                prev_hash = row['row_hash']
+                last_id = row['id']
+                checked += 1
+
+        if head is None:
+            return checked, None if last_id is None else 0
+        if head['audit_id'] != last_id or head['row_hash'] != prev_hash:
+            return checked, 0
+        return checked, None
+
 
 def print_error(message: str):
     """Print error message."""
@@ -667,6 +798,18 @@ def cmd_audit_log(args, config: ConfigManager, db: DatabaseManager):
     try:
         manager = AuditLogManager(db)
 
+        if args.verify:
+            checked, broken_at = manager.verify_chain()
+            if broken_at is None:
+                print_success(f"Audit chain intact ({checked} chained entries)")
+            elif broken_at == 0:
+                print_error(f"Audit chain head does not match the last of {checked} entries")
+                sys.exit(1)
+            else:
+                print_error(f"Audit chain broken at entry {broken_at} ({checked} valid before it)")
+                sys.exit(1)
+            return
+
         logs = manager.query_audit_log(
             api_key_prefix=args.api_key,
             endpoint=args.endpoint,
@@ -826,6 +969,11 @@ def main():
         default=100,
         help='Max entries to show (default: 100)',
     )
+    audit_parser.add_argument(
+        '--verify',
+        action='store_true',
+        help='Verify the audit log hash chain instead of listing entries',
+    )
 
     # init-db command
     init_parser = subparsers.add_parser(
@@ -37,6 +37,17 @@ class Settings(BaseSettings):
     ceph_keyring: str = "/etc/ceph/ceph.client.admin.keyring"
     ceph_user: str = "admin"
     ceph_command_timeout: int = 30
+    # Seconds the ceph CLI waits to reach the monitors before giving up
+    ceph_connect_timeout: int = 10
+    # Worker threads for blocking calls (librados commands, audit log writes)
+    ceph_thread_pool_size: int = 32
+    # Persistent librados connections shared by concurrent monitor commands
+    ceph_connection_pool_size: int = Field(default=10, ge=1, le=20)
+
+    # Response cache shared between workers ("memory" keeps it per process)
+    cache_backend: Literal["memory", "redis"] = "memory"
+    redis_url: str = "redis://localhost:6379/0"
+    cache_refresh_enabled: bool = True
 
     # Filesystem Defaults
     default_crush_rule: str = "replicated_mach2"
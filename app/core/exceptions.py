@@ -1,8 +1,12 @@
 """Custom exception classes for the API."""
 
+import re
 from typing import Dict, Union
 from typing import Any
 
+# Ceph stderr wording for a missing entity
+_NOT_FOUND_RE = re.compile(r"not found|does not exist", re.IGNORECASE)
+
 
 class CephAPIException(Exception):
     """Base exception for all Ceph API errors."""
@@ -28,6 +32,19 @@ class CephAPIException(Exception):
         self.details = details or {}
         super().__init__(message)
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Build the error response body.
+
+        Returns:
+            Dict in the ``APIResponse`` error shape
+        """
+        return {
+            "status": "error",
+            "code": self.code,
+            "message": self.message,
+            "details": self.details,
+        }
+
 
 class FilesystemAlreadyExistsError(CephAPIException):
     """Raised when attempting to create a filesystem that already exists."""
@@ -90,8 +107,16 @@ class CephCommandFailedError(CephAPIException):
         exit_code: int,
         stderr: str,
         details: Union[Union[Dict[str, Any], None]] = None,
+        unavailable: bool = False,
     ) -> None:
-        """Initialize with command execution details."""
+        """Initialize with command execution details.
+
+        ``unavailable`` marks failures where the cluster could not be reached
+        (e.g. a timeout) rather than the command itself being rejected.
+        ``is_not_found`` is set when stderr reports a missing entity.
+        """
+        self.is_unavailable = unavailable
+        self.is_not_found = _NOT_FOUND_RE.search(stderr) is not None
         error_details = details or {}
         error_details.update({
             "command": command,
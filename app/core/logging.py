@@ -1,10 +1,11 @@
 """Logging configuration and audit logging."""
 
+import asyncio
 import json
 import logging
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Union
+from typing import Any, Dict, List, Union
 
 from .config import get_settings
 
@@ -21,12 +22,23 @@ def setup_logging() -> None:
 
 
 class AuditLogger:
-    """Audit logger for tracking API operations."""
+    """Audit logger for tracking API operations.
+
+    Once ``start()`` has been called from the running event loop, entries are
+    queued and written by a background task so request handlers never block on
+    audit I/O. Before that (or if the queue is full) entries are written
+    synchronously.
+    """
+
+    QUEUE_SIZE = 10000
+    BATCH_SIZE = 100
 
     def __init__(self) -> None:
         """Initialize audit logger."""
         self.settings = get_settings()
         self.logger = logging.getLogger("audit")
+        self._queue: Union[asyncio.Queue, None] = None
+        self._drain_task: Union[asyncio.Task, None] = None
 
         if self.settings.audit_log_enabled:
             # Ensure log directory exists
@@ -68,8 +80,68 @@ class AuditLogger:
             "details": details or {},
         }
 
+        # Serialization happens in the drain task, off the request path
+        if self._queue is not None:
+            try:
+                self._queue.put_nowait(audit_entry)
+                return
+            except asyncio.QueueFull:
+                pass
+
         self.logger.info(json.dumps(audit_entry))
 
+    def start(self) -> None:
+        """Start writing audit entries from a background task.
+
+        Must be called from within the running event loop.
+        """
+        if self._drain_task is not None or not self.settings.audit_log_enabled:
+            return
+
+        self._queue = asyncio.Queue(maxsize=self.QUEUE_SIZE)
+        self._drain_task = asyncio.create_task(self._drain())
+
+    async def stop(self) -> None:
+        """Flush queued audit entries and stop the background task."""
+        if self._drain_task is None or self._queue is None:
+            return
+
+        queue = self._queue
+        await queue.join()
+        self._drain_task.cancel()
+        try:
+            await self._drain_task
+        except asyncio.CancelledError:
+            pass
+        self._queue = None
+        self._drain_task = None
+
+    async def _drain(self) -> None:
+        """Write queued entries in batches off the event loop."""
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            batch: List[Dict[str, Any]] = [await queue.get()]
+            while len(batch) < self.BATCH_SIZE and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+            except Exception:
+                logging.getLogger(__name__).exception("Failed to write audit entries")
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """Serialize a batch of entries and write one log record per entry.
+
+        Separate records keep each entry on its own formatted line in every
+        handler the "audit" logger propagates to, and one event per entry for
+        record-oriented log shippers.
+        """
+        for entry in batch:
+            self.logger.info(json.dumps(entry))
+
 
 # Global audit logger instance
 audit_logger = AuditLogger()
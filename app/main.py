@@ -1,17 +1,21 @@
 """Main FastAPI application."""
 
+import asyncio
 import logging
-from typing import Dict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
 
 from fastapi import FastAPI, Request, status
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 
 from app.core.config import get_settings
 from app.core.exceptions import CephAPIException
-from app.core.logging import setup_logging
+from app.core.logging import audit_logger, setup_logging
 from app.models.filesystem import APIResponse
 from app.routers import auth, cluster, filesystem, osd, snapshot
+from app.services.ceph_client import ceph_client
 
 # Setup logging
 setup_logging()
@@ -20,6 +24,30 @@ logger = logging.getLogger(__name__)
 # Get settings
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Start background services and tear them down on shutdown."""
+    logger.info("Starting Ceph Management API")
+    logger.info(f"Environment: {settings.environment}")
+    logger.info(f"Debug mode: {settings.debug}")
+    # Blocking Ceph calls run in the default executor; size it for concurrency
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=settings.ceph_thread_pool_size)
+    )
+    audit_logger.start()
+    await asyncio.to_thread(ceph_client.connect)
+    if settings.cache_refresh_enabled:
+        cluster.start_cache_refresh()
+
+    yield
+
+    logger.info("Shutting down Ceph Management API")
+    await cluster.stop_cache_refresh()
+    ceph_client.shutdown()
+    await audit_logger.stop()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Ceph Management API",
@@ -28,6 +56,8 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 
@@ -36,31 +66,21 @@ app = FastAPI(
 async def ceph_api_exception_handler(
     request: Request,
     exc: CephAPIException,
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Handle CephAPIException and return structured error response."""
     logger.error(
         f"CephAPIException: {exc.code} - {exc.message}",
         extra={"details": exc.details},
     )
 
-    response = APIResponse(
-        status="error",
-        code=exc.code,
-        message=exc.message,
-        details=exc.details,
-    )
-
-    return JSONResponse(
-        status_code=exc.status_code,
-        content=response.model_dump(exclude_none=True),
-    )
+    return ORJSONResponse(status_code=exc.status_code, content=exc.to_dict())
 
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(
     request: Request,
     exc: RequestValidationError,
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Handle request validation errors."""
     logger.warning(f"Validation error: {exc.errors()}")
 
@@ -80,7 +100,7 @@ async def validation_exception_handler(
         details={"errors": sanitized},
     )
 
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content=response.model_dump(exclude_none=True),
     )
@@ -90,7 +110,7 @@ async def validation_exception_handler(
 async def general_exception_handler(
     request: Request,
     exc: Exception,
-) -> JSONResponse:
+) -> ORJSONResponse:
     """Handle unexpected exceptions."""
     logger.error(f"Unexpected error: {exc}", exc_info=True)
 
@@ -101,7 +121,7 @@ async def general_exception_handler(
         details={"error": str(exc)} if settings.debug else {},
     )
 
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content=response.model_dump(exclude_none=True),
     )
@@ -144,19 +164,3 @@ app.include_router(
     prefix=f"{settings.api_v1_prefix}/snapshots",
     tags=["Snapshots"],
 )
-
-
-# Startup event
-@app.on_event("startup")
-async def startup_event() -> None:
-    """Application startup tasks."""
-    logger.info("Starting Ceph Management API")
-    logger.info(f"Environment: {settings.environment}")
-    logger.info(f"Debug mode: {settings.debug}")
-
-
-# Shutdown event
-@app.on_event("shutdown")
-async def shutdown_event() -> None:
-    """Application shutdown tasks."""
-    logger.info("Shutting down Ceph Management API")
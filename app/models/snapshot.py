@@ -5,6 +5,12 @@ from typing import List, Literal, Union
 
 from pydantic import BaseModel, Field, field_validator
 
+# Schedule strings: <number><unit>, compiled once for all validations
+_SCHEDULE_RE = re.compile(r"(\d+)([hdwMy])", re.ASCII)
+
+# Largest schedule number accepted per unit
+_SCHEDULE_MAX_VALUES = {"h": 8760, "d": 3650, "w": 520, "M": 1200, "y": 100}
+
 
 class SnapshotRetentionPolicy(BaseModel):
     """Retention policy for snapshots."""
@@ -106,28 +112,25 @@ class AddSnapshotScheduleRequest(BaseModel):
         Raises:
             ValueError: If schedule format is invalid
         """
-        pattern = r"^(\d+)(h|d|w|M|y)$"
-        if not re.match(pattern, v):
+        match = _SCHEDULE_RE.fullmatch(v)
+        if not match:
             raise ValueError(
                 "Invalid schedule format. Must be <number><unit> where unit is h, d, w, M, or y. "
                 "Examples: 1h (hourly), 6h (every 6 hours), 1d (daily), 1w (weekly), 1M (monthly), 1y (yearly)"
             )
 
-        # Extract number and validate it's positive
-        match = re.match(pattern, v)
-        if match:
-            number = int(match.group(1))
-            unit = match.group(2)
-
-            if number <= 0:
-                raise ValueError("Schedule number must be positive")
-
-            # Validate reasonable ranges
-            max_values = {"h": 8760, "d": 3650, "w": 520, "M": 1200, "y": 100}
-            if number > max_values[unit]:
-                raise ValueError(
-                    f"Schedule number too large for unit {unit}. Maximum is {max_values[unit]}"
-                )
+        # Validate the number is positive and within a reasonable range
+        number = int(match.group(1))
+        unit = match.group(2)
+
+        if number <= 0:
+            raise ValueError("Schedule number must be positive")
+
+        if number > _SCHEDULE_MAX_VALUES[unit]:
+            raise ValueError(
+                f"Schedule number too large for unit {unit}. "
+                f"Maximum is {_SCHEDULE_MAX_VALUES[unit]}"
+            )
 
         return v
 
@@ -1,29 +1,23 @@
 """Cluster information endpoints."""
 
+import asyncio
+import hashlib
 import logging
-from datetime import datetime, timedelta, timezone
+import time
+from collections import OrderedDict
 from functools import wraps
-from typing import Annotated, Any, Callable, Dict, List
+from typing import Annotated, Any, Callable, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends
+import orjson
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import ORJSONResponse, Response
 
 from app.core.auth import AuthContext, verify_api_key
-from app.core.exceptions import CephAPIException, CephCommandFailedError
+from app.core.exceptions import CephCommandFailedError
 from app.core.logging import audit_logger
-from app.models.cluster import (
-    APIResponse,
-    ClusterDfData,
-    ClusterStats,
-    ClusterStatusData,
-    MonitorsResponse,
-    MonStatus,
-    MonitorInfo,
-    OSDStatus,
-    PGStatus,
-    PoolInfo,
-    PoolStats,
-)
+from app.models.cluster import APIResponse
 from app.services.ceph_client import ceph_client
+from app.services.response_cache import get_shared_cache
 
 logger = logging.getLogger(__name__)
 
@@ -34,37 +28,350 @@ router = APIRouter(prefix="", tags=["Cluster"])
 class CacheEntry:
     """Cache entry with TTL."""
 
-    def __init__(self, value: Any, ttl_seconds: int) -> None:
+    def __init__(self, value: Any, ttl_seconds: float) -> None:
         self.value = value
-        self.expires_at = datetime.now(timezone.utc) + timedelta(seconds=ttl_seconds)
+        self.expires_at: float = time.monotonic() + ttl_seconds
 
     def is_expired(self) -> bool:
-        return datetime.now(timezone.utc) > self.expires_at
+        return time.monotonic() > self.expires_at
+
+
+# Bounded LRU of cached responses; expired entries are swept periodically
+_CACHE_MAX_ENTRIES = 1024
+_CACHE_SWEEP_INTERVAL = 64
+
+_cache: "OrderedDict[str, CacheEntry]" = OrderedDict()
+_cache_inserts = 0
+
+# Per-key locks so only one coroutine refreshes an expired entry
+_locks: Dict[str, asyncio.Lock] = {}
+
+# Last built payload and encoded envelope per endpoint, keyed by a fingerprint
+# of its source data (for monitors, the monmap epoch)
+_fingerprint_cache: Dict[str, Tuple[Any, Dict[str, Any], bytes]] = {}
+
+
+def _is_current(name: str, fingerprint: Any) -> bool:
+    """Return whether the cached envelope for ``name`` matches ``fingerprint``."""
+    cached = _fingerprint_cache.get(name)
+    return fingerprint is not None and cached is not None and cached[0] == fingerprint
+
+
+def _success_response(
+    name: str,
+    fingerprint: Any,
+    build: Callable[[], Dict[str, Any]],
+) -> Tuple[Dict[str, Any], Response]:
+    """Return the payload and encoded success envelope for an endpoint.
+
+    The envelope is built and encoded once per fingerprint; an unchanged
+    fingerprint reuses the previously encoded bytes.
+    """
+    if _is_current(name, fingerprint):
+        _, data, body = _fingerprint_cache[name]
+    else:
+        data = build()
+        body = _encode_success(data)
+        _fingerprint_cache[name] = (fingerprint, data, body)
+    return data, Response(content=body, media_type="application/json")
+
+
+def _encode_success(data: Dict[str, Any]) -> bytes:
+    """Encode the success envelope for an endpoint payload."""
+    return orjson.dumps({"status": "success", "data": data})
+
+
+def _make_cache_key(name: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> str:
+    """Build a cache key from the call arguments.
+
+    The per-request ``AuthContext`` and ``request`` are excluded: permissions
+    are enforced by the route dependency before the endpoint runs, and their
+    reprs differ for every request, which would otherwise make every call a
+    miss.
+    """
+    params = sorted(
+        (key, value)
+        for key, value in kwargs.items()
+        if key != "request" and not isinstance(value, AuthContext)
+    )
+    return f"{name}:{args!r}:{params!r}"
+
+
+def _cache_store(cache_key: str, entry: CacheEntry) -> None:
+    """Insert an entry, evicting the least recently used and expired ones."""
+    global _cache_inserts
+
+    _cache[cache_key] = entry
+    _cache.move_to_end(cache_key)
+    if len(_cache) > _CACHE_MAX_ENTRIES:
+        evicted, _ = _cache.popitem(last=False)
+        lock = _locks.get(evicted)
+        if lock is not None and not lock.locked():
+            del _locks[evicted]
+
+    _cache_inserts += 1
+    if _cache_inserts % _CACHE_SWEEP_INTERVAL == 0:
+        for key in [k for k, v in _cache.items() if v.is_expired()]:
+            _cache.pop(key, None)
+
+
+def _etag(body: bytes) -> str:
+    """Return a strong ETag for a response body."""
+    return f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+
+def _cached_response(request: Optional[Request], entry: CacheEntry) -> Response:
+    """Build the HTTP response for a cached ``(body, etag)`` entry.
+
+    Clients may reuse the body until the entry expires; a request whose
+    ``If-None-Match`` matches the ETag gets an empty 304. Responses require an
+    API key, so they are marked ``private`` and vary on ``X-API-Key`` to keep
+    shared proxies from serving them to other callers.
+    """
+    body, etag = entry.value
+    max_age = max(int(entry.expires_at - time.monotonic()), 0)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={max_age}",
+        "Vary": "X-API-Key",
+    }
+    if request is not None:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and (
+            if_none_match.strip() == "*"
+            or etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+        ):
+            return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def ttl_cache(ttl_seconds: int, audit_resource: Optional[str] = None) -> Callable:
+    """Decorator to cache serialized endpoint responses with TTL.
+
+    The wrapped endpoint must return a ``Response``; its body bytes are cached
+    and replayed on hits without re-encoding. Responses carry ``ETag`` and
+    ``Cache-Control`` headers, and a ``request`` keyword argument, when
+    present, enables ``If-None-Match`` handling.
+
+    With ``audit_resource`` set, cache hits are audited as reads of that
+    resource by the request's ``auth`` user; misses are audited by the
+    endpoint itself. The background refresh keeps entries warm, so without
+    this most successful reads would never reach the audit log.
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            request = kwargs.get("request")
+            cache_key = _make_cache_key(func.__name__, args, kwargs)
+            entry = _cache.get(cache_key)
+            if entry is not None and not entry.is_expired():
+                logger.debug(f"Cache hit for {func.__name__}")
+                _cache.move_to_end(cache_key)
+                return _hit(request, kwargs, entry)
+            lock = _locks.setdefault(cache_key, asyncio.Lock())
+            async with lock:
+                # Another coroutine may have refreshed the entry while we waited
+                entry = _cache.get(cache_key)
+                if entry is not None and not entry.is_expired():
+                    return _hit(request, kwargs, entry)
+
+                # Another worker may already have refreshed the shared cache
+                entry = await _load_shared(cache_key)
+                if entry is not None:
+                    return _hit(request, kwargs, entry)
+
+                entry = await _populate(cache_key, args, kwargs)
+                return _cached_response(request, entry)
+
+        def _hit(
+            request: Optional[Request], kwargs: Dict[str, Any], entry: CacheEntry
+        ) -> Response:
+            """Audit a read served from the cache and build its response."""
+            auth = kwargs.get("auth")
+            if audit_resource is not None and isinstance(auth, AuthContext):
+                _audit_read(auth, audit_resource, {"cached": True})
+            return _cached_response(request, entry)
+
+        async def _load_shared(cache_key: str, min_remaining: float = 0) -> Optional[CacheEntry]:
+            """Copy the shared entry into the local cache if enough TTL is left."""
+            shared = get_shared_cache()
+            if shared is None:
+                return None
+            cached = await shared.get(cache_key)
+            if cached is None or cached[1] <= min_remaining:
+                return None
+            body, remaining = cached
+            entry = CacheEntry((body, _etag(body)), remaining)
+            _cache_store(cache_key, entry)
+            return entry
+
+        async def _populate(
+            cache_key: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]
+        ) -> CacheEntry:
+            result = await func(*args, **kwargs)
+            # Cache the serialized body so hits skip JSON encoding entirely
+            entry = CacheEntry((result.body, _etag(result.body)), ttl_seconds)
+            _cache_store(cache_key, entry)
+            shared = get_shared_cache()
+            if shared is not None:
+                await shared.set(cache_key, result.body, ttl_seconds)
+            return entry
+
+        async def refresh(*args: Any, **kwargs: Any) -> None:
+            """Recompute and store the cached response regardless of local expiry.
+
+            With a shared cache, an entry another worker refreshed recently
+            (more than half its TTL left) is reused instead, so W workers do
+            not each query Ceph on every refresh cycle.
+            """
+            cache_key = _make_cache_key(func.__name__, args, kwargs)
+            async with _locks.setdefault(cache_key, asyncio.Lock()):
+                if await _load_shared(cache_key, min_remaining=ttl_seconds / 2) is None:
+                    await _populate(cache_key, args, kwargs)
+
+        wrapper.refresh = refresh  # type: ignore[attr-defined]
+        wrapper.ttl_seconds = ttl_seconds  # type: ignore[attr-defined]
+        return wrapper
+    return decorator
+
+
+# Identity of the background cache refresh; its reads are not audited
+_REFRESH_AUTH = AuthContext(user="system", permissions=["cluster:read"])
+
+
+def _audit_read(auth: AuthContext, resource: str, details: Dict[str, Any]) -> None:
+    """Audit a successful read, skipping the background cache refresh."""
+    if auth is _REFRESH_AUTH:
+        return
+    audit_logger.log_operation(
+        operation="READ",
+        resource=resource,
+        user=auth.user,
+        status="SUCCESS",
+        details=details,
+    )
 
 
-_cache: Dict[str, CacheEntry] = {}
+def _error_code(exc: Exception) -> str:
+    """Classify an endpoint failure into an error code."""
+    if isinstance(exc, CephCommandFailedError) and exc.is_unavailable:
+        return "CEPH_UNAVAILABLE"
+    return "CEPH_COMMAND_FAILED"
 
 
-def ttl_cache(ttl_seconds: int) -> Callable:
-    """Decorator to cache function results with TTL."""
+def ceph_route(resource: str) -> Callable:
+    """Decorator turning endpoint failures into audited error responses.
+
+    Apply it outside ``ttl_cache`` so failures propagate through the cache
+    and are never stored.
+
+    Args:
+        resource: Audit resource name (e.g., cluster:status)
+    """
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> Any:
-            cache_key = f"{func.__name__}:{str(args)}:{str(kwargs)}"
-            if cache_key in _cache:
-                entry = _cache[cache_key]
-                if not entry.is_expired():
-                    logger.debug(f"Cache hit for {func.__name__}")
-                    return entry.value
-                else:
-                    del _cache[cache_key]
-            result = await func(*args, **kwargs)
-            _cache[cache_key] = CacheEntry(result, ttl_seconds)
-            return result
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                message = str(e)
+                logger.exception(f"Error reading {resource}")
+                audit_logger.log_operation(
+                    operation="READ",
+                    resource=resource,
+                    user=kwargs["auth"].user,
+                    status="FAILED",
+                    details={"error": message},
+                )
+                return ORJSONResponse({
+                    "status": "error",
+                    "code": _error_code(e),
+                    "message": message,
+                    "details": {},
+                }, headers={"Cache-Control": "no-store"})
         return wrapper
     return decorator
 
 
+def _build_monitors(mon_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the ``MonitorsResponse`` payload from ``ceph mon dump`` output."""
+    monitors = []
+    for mon in mon_data.get("mons", []):
+        monitors.append({
+            "name": mon.get("name", ""),
+            # Get the v1 address (port 6789) without the "/nonce" suffix
+            "addr": mon.get("addr", "").partition("/")[0],
+            "rank": mon.get("rank", 0),
+        })
+
+    return {"monitors": monitors, "total": len(monitors)}
+
+
+def _build_status(status_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the ``ClusterStatusData`` payload from ``ceph status`` output."""
+    # Monitor status - monmap.num_mons is at root level in newer Ceph
+    monmap = status_data.get("monmap", {})
+
+    # OSD status - osdmap is directly at root level (not nested) in newer Ceph
+    osdmap = status_data.get("osdmap", {})
+    # Handle both old nested format and new flat format
+    if "osdmap" in osdmap:
+        osdmap = osdmap["osdmap"]
+
+    # PG status
+    pgmap = status_data.get("pgmap", {})
+    pgs_by_state = {
+        pg_state.get("state_name"): pg_state.get("count", 0)
+        for pg_state in pgmap.get("pgs_by_state", [])
+    }
+
+    return {
+        "health": status_data.get("health", {}).get("status", "UNKNOWN"),
+        "mon_status": {
+            "epoch": monmap.get("epoch", 0),
+            "num_mons": monmap.get("num_mons", 0),
+            "quorum": status_data.get("quorum", []),
+        },
+        "osd_status": {
+            "num_osds": osdmap.get("num_osds", 0),
+            "num_up_osds": osdmap.get("num_up_osds", 0),
+            "num_in_osds": osdmap.get("num_in_osds", 0),
+        },
+        "pg_status": {
+            "num_pgs": pgmap.get("num_pgs", 0),
+            "num_active_clean": pgs_by_state.get("active+clean", 0),
+        },
+    }
+
+
+def _build_df(df_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the ``ClusterDfData`` payload from ``ceph df`` output."""
+    stats_raw = df_data.get("stats", {})
+    pools = []
+    for pool_data in df_data.get("pools", []):
+        pool_stats = pool_data.get("stats", {})
+        pools.append({
+            "name": pool_data.get("name", ""),
+            "id": pool_data.get("id", 0),
+            "stats": {
+                "stored": pool_stats.get("stored", 0),
+                "objects": pool_stats.get("objects", 0),
+                "kb_used": pool_stats.get("kb_used", 0),
+                "bytes_used": pool_stats.get("bytes_used", 0),
+                "percent_used": float(pool_stats.get("percent_used", 0.0)),
+            },
+        })
+
+    return {
+        "stats": {
+            "total_bytes": stats_raw.get("total_bytes", 0),
+            "total_used_bytes": stats_raw.get("total_used_bytes", 0),
+            "total_avail_bytes": stats_raw.get("total_avail_bytes", 0),
+        },
+        "pools": pools,
+    }
+
+
 async def require_cluster_read(
     auth: Annotated[AuthContext, Depends(verify_api_key)],
 ) -> AuthContext:
@@ -73,218 +380,95 @@ async def require_cluster_read(
 
 
 @router.get("/monitors", response_model=APIResponse)
-@ttl_cache(ttl_seconds=300)
+@ceph_route("cluster:monitors")
+@ttl_cache(ttl_seconds=300, audit_resource="cluster:monitors")
 async def get_monitors(
+    request: Request,
     auth: Annotated[AuthContext, Depends(require_cluster_read)],
-) -> Dict[str, Any]:
+) -> Response:
     """Get monitor addresses."""
-    try:
+    # The monmap rarely changes: probe its epoch with the cheap `mon stat`
+    # and only fetch the full map when the epoch has moved
+    mon_stat = await ceph_client.mon_command("mon stat")
+    epoch = mon_stat.get("epoch")
+
+    monmap: Dict[str, Any] = {}
+    if not _is_current("monitors", epoch):
         # Use ceph mon dump to get full monitor info
-        mon_data = ceph_client.execute_command(
-            ["mon", "dump", "--format", "json"],
-            parse_json=True,
-        )
-
-        monitors = []
-        for mon in mon_data.get("mons", []):
-            # Get the v1 address (port 6789)
-            addr = mon.get("addr", "")
-            if "/" in addr:
-                addr = addr.split("/")[0]
-
-            monitors.append(
-                MonitorInfo(
-                    name=mon.get("name", ""),
-                    addr=addr,
-                    rank=mon.get("rank", 0),
-                )
-            )
-
-        response_data = MonitorsResponse(
-            monitors=monitors,
-            total=len(monitors),
-        )
-
-        audit_logger.log_operation(
-            operation="READ",
-            resource="cluster:monitors",
-            user=auth.user,
-            status="SUCCESS",
-            details={"monitor_count": len(monitors)},
-        )
-
-        return {
-            "status": "success",
-            "data": response_data.model_dump(),
-        }
-
-    except Exception as e:
-        logger.exception("Error getting monitors")
-        audit_logger.log_operation(
-            operation="READ",
-            resource="cluster:monitors",
-            user=auth.user,
-            status="FAILED",
-            details={"error": str(e)},
-        )
-        return {
-            "status": "error",
-            "code": "CEPH_COMMAND_FAILED",
-            "message": str(e),
-            "details": {},
-        }
+        monmap = await ceph_client.mon_command("mon dump")
+
+    data, response = _success_response(
+        "monitors", epoch, lambda: _build_monitors(monmap)
+    )
+
+    _audit_read(auth, "cluster:monitors", {"monitor_count": data["total"]})
+
+    return response
 
 
 @router.get("/status", response_model=APIResponse)
-@ttl_cache(ttl_seconds=30)
+@ceph_route("cluster:status")
+@ttl_cache(ttl_seconds=30, audit_resource="cluster:status")
 async def get_cluster_status(
+    request: Request,
     auth: Annotated[AuthContext, Depends(require_cluster_read)],
-) -> Dict[str, Any]:
+) -> Response:
     """Get cluster status."""
-    try:
-        status_data = ceph_client.execute_command(
-            ["status", "--format", "json"],
-            parse_json=True,
-        )
-
-        # Health
-        health = status_data.get("health", {}).get("status", "UNKNOWN")
-
-        # Monitor status - monmap.num_mons is at root level in newer Ceph
-        monmap = status_data.get("monmap", {})
-        mon_status = MonStatus(
-            epoch=monmap.get("epoch", 0),
-            num_mons=monmap.get("num_mons", 0),
-            quorum=status_data.get("quorum", []),
-        )
-
-        # OSD status - osdmap is directly at root level (not nested) in newer Ceph
-        osdmap = status_data.get("osdmap", {})
-        # Handle both old nested format and new flat format
-        if "osdmap" in osdmap:
-            osdmap = osdmap["osdmap"]
-        
-        osd_status = OSDStatus(
-            num_osds=osdmap.get("num_osds", 0),
-            num_up_osds=osdmap.get("num_up_osds", 0),
-            num_in_osds=osdmap.get("num_in_osds", 0),
-        )
-
-        # PG status
-        pgmap = status_data.get("pgmap", {})
-        num_pgs = pgmap.get("num_pgs", 0)
-        num_active_clean = 0
-        for pg_state in pgmap.get("pgs_by_state", []):
-            if pg_state.get("state_name") == "active+clean":
-                num_active_clean = pg_state.get("count", 0)
-                break
-
-        pg_status = PGStatus(
-            num_pgs=num_pgs,
-            num_active_clean=num_active_clean,
-        )
-
-        response_data = ClusterStatusData(
-            health=health,
-            mon_status=mon_status,
-            osd_status=osd_status,
-            pg_status=pg_status,
-        )
-
-        audit_logger.log_operation(
-            operation="READ",
-            resource="cluster:status",
-            user=auth.user,
-            status="SUCCESS",
-            details={"health": health},
-        )
-
-        return {
-            "status": "success",
-            "data": response_data.model_dump(),
-        }
-
-    except Exception as e:
-        logger.exception("Error getting cluster status")
-        audit_logger.log_operation(
-            operation="READ",
-            resource="cluster:status",
-            user=auth.user,
-            status="FAILED",
-            details={"error": str(e)},
-        )
-        return {
-            "status": "error",
-            "code": "CEPH_COMMAND_FAILED",
-            "message": str(e),
-            "details": {},
-        }
+    status_data = await ceph_client.mon_command("status")
+
+    data = _build_status(status_data)
+
+    _audit_read(auth, "cluster:status", {"health": data["health"]})
+
+    return Response(content=_encode_success(data), media_type="application/json")
 
 
 @router.get("/df", response_model=APIResponse)
-@ttl_cache(ttl_seconds=30)
+@ceph_route("cluster:df")
+@ttl_cache(ttl_seconds=30, audit_resource="cluster:df")
 async def get_cluster_df(
+    request: Request,
     auth: Annotated[AuthContext, Depends(require_cluster_read)],
-) -> Dict[str, Any]:
+) -> Response:
     """Get cluster disk usage."""
-    try:
-        df_data = ceph_client.get_cluster_df()
-
-        stats_raw = df_data.get("stats", {})
-        cluster_stats = ClusterStats(
-            total_bytes=stats_raw.get("total_bytes", 0),
-            total_used_bytes=stats_raw.get("total_used_bytes", 0),
-            total_avail_bytes=stats_raw.get("total_avail_bytes", 0),
-        )
-
-        pools = []
-        for pool_data in df_data.get("pools", []):
-            pool_stats_raw = pool_data.get("stats", {})
-            pool_stats = PoolStats(
-                stored=pool_stats_raw.get("stored", 0),
-                objects=pool_stats_raw.get("objects", 0),
-                kb_used=pool_stats_raw.get("kb_used", 0),
-                bytes_used=pool_stats_raw.get("bytes_used", 0),
-                percent_used=pool_stats_raw.get("percent_used", 0.0),
-            )
-            pools.append(
-                PoolInfo(
-                    name=pool_data.get("name", ""),
-                    id=pool_data.get("id", 0),
-                    stats=pool_stats,
-                )
-            )
-
-        response_data = ClusterDfData(
-            stats=cluster_stats,
-            pools=pools,
-        )
-
-        audit_logger.log_operation(
-            operation="READ",
-            resource="cluster:df",
-            user=auth.user,
-            status="SUCCESS",
-            details={"pool_count": len(pools)},
-        )
-
-        return {
-            "status": "success",
-            "data": response_data.model_dump(),
-        }
-
-    except Exception as e:
-        logger.exception("Error getting cluster df")
-        audit_logger.log_operation(
-            operation="READ",
-            resource="cluster:df",
-            user=auth.user,
-            status="FAILED",
-            details={"error": str(e)},
-        )
-        return {
-            "status": "error",
-            "code": "CEPH_COMMAND_FAILED",
-            "message": str(e),
-            "details": {},
-        }
+    df_data = await ceph_client.get_cluster_df()
+
+    data = _build_df(df_data)
+
+    _audit_read(auth, "cluster:df", {"pool_count": len(data["pools"])})
+
+    return Response(content=_encode_success(data), media_type="application/json")
+
+
+# Background refresh keeps the cache warm so user requests are always hits
+_refresh_tasks: List[asyncio.Task] = []
+
+
+async def _periodic_refresh(endpoint: Callable) -> None:
+    """Refresh a cached endpoint shortly before its entry expires."""
+    interval = max(endpoint.ttl_seconds * 5 // 6, 1)  # type: ignore[attr-defined]
+    while True:
+        try:
+            await endpoint.refresh(request=None, auth=_REFRESH_AUTH)  # type: ignore[attr-defined]
+        except Exception:
+            logger.exception(f"Background refresh of {endpoint.__name__} failed")
+        await asyncio.sleep(interval)
+
+
+def start_cache_refresh() -> None:
+    """Warm the cluster cache and keep refreshing it in the background.
+
+    Must be called from within the running event loop.
+    """
+    if _refresh_tasks:
+        return
+    for endpoint in (get_cluster_status, get_monitors, get_cluster_df):
+        _refresh_tasks.append(asyncio.create_task(_periodic_refresh(endpoint)))
+
+
+async def stop_cache_refresh() -> None:
+    """Cancel the background refresh tasks."""
+    for task in _refresh_tasks:
+        task.cancel()
+    await asyncio.gather(*_refresh_tasks, return_exceptions=True)
+    _refresh_tasks.clear()
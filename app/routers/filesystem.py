@@ -1,9 +1,23 @@
 """CephFS filesystem management endpoints."""
 
+import asyncio
 import logging
-from typing import Annotated, Union
+from dataclasses import dataclass
+from typing import (
+    Annotated,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Tuple,
+    Union,
+)
 
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
 
 from app.core.auth import AuthContext, require_fs_read, require_fs_write
 from app.core.exceptions import (
@@ -19,99 +33,108 @@ from app.models.filesystem import (
     APIResponse,
     CreateFilesystemRequest,
     CreateFilesystemResponse,
-    FilesystemInfo,
-    FilesystemUsageResponse,
-    FilesystemUsageStats,
-    FilesystemWithUsage,
-    ListFilesystemsResponse,
 )
+from app.services.ceph_cache import ceph_read_cache
 from app.services.ceph_client import ceph_client
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="", tags=["Filesystems"])
 
+# Bytes to TB (1 TB = 1024^4 bytes)
+_TB_DIVISOR = 1.0 / (1024**4)
+
+
+async def _load_filesystems() -> Dict[str, Dict[str, Any]]:
+    """Load filesystems from Ceph indexed by name, preserving list order."""
+    return {fs["name"]: fs for fs in await ceph_client.list_filesystems()}
+
 
-def _get_pool_usage(pool_name: str, df_data: dict) -> Union[FilesystemUsageStats, None]:
+async def _load_pools() -> Dict[str, Dict[str, Any]]:
+    """Load pool entries from 'ceph df detail' indexed by pool name."""
+    df_data = await ceph_client.get_cluster_df()
+    return {pool.get("name"): pool for pool in df_data.get("pools", [])}
+
+
+def _get_pool_usage(
+    pool_name: str, pools_by_name: Dict[str, Dict[str, Any]]
+) -> Union[Dict[str, Any], None]:
     """Extract usage statistics for a specific pool.
 
     Args:
         pool_name: Name of the pool
-        df_data: Output from 'ceph df detail --format json'
+        pools_by_name: Pools from 'ceph df detail --format json' indexed by name
 
     Returns:
-        FilesystemUsageStats if pool found, None otherwise
+        FilesystemUsageStats fields as a dict if pool found, None otherwise
     """
-    pools = df_data.get("pools", [])
-
-    for pool in pools:
-        if pool.get("name") == pool_name:
-            stats = pool.get("stats", {})
-            stored = stats.get("stored", 0)
-            used = stats.get("bytes_used", 0)
-            objects = stats.get("objects", 0)
-            percent_used = stats.get("percent_used", 0.0)
-
-            # Calculate TB from bytes (1 TB = 1024^4 bytes)
-            stored_tb = round(stored / (1024**4), 3)
-
-            return FilesystemUsageStats(
-                stored_bytes=stored,
-                stored_tb=stored_tb,
-                used_bytes=used,
-                objects=objects,
-                percent_used=percent_used,
-            )
+    pool = pools_by_name.get(pool_name)
+    if pool is None:
+        return None
+
+    stats = pool.get("stats", {})
+    stored = stats.get("stored", 0)
+    used = stats.get("bytes_used", 0)
+    objects = stats.get("objects", 0)
+    percent_used = stats.get("percent_used", 0.0)
+
+    stored_tb = round(stored * _TB_DIVISOR, 3)
+
+    return {
+        "stored_bytes": stored,
+        "stored_tb": stored_tb,
+        "used_bytes": used,
+        "objects": objects,
+        "percent_used": float(percent_used),
+    }
+
+
+@dataclass(frozen=True, slots=True)
+class FsLayout:
+    """Names of the Ceph objects backing a filesystem."""
+
+    name: str
+    meta_pool: str
+    data_pool: str
+    auth_client: str
+
+    @classmethod
+    def from_request(cls, request: CreateFilesystemRequest) -> "FsLayout":
+        """Derive the layout for a filesystem creation request.
+
+        Args:
+            request: Filesystem creation parameters
+
+        Returns:
+            FsLayout for the requested filesystem
+        """
+        return cls(
+            name=request.name,
+            meta_pool=f"cephfs.{request.name}.meta",
+            data_pool=f"cephfs.{request.name}.data",
+            auth_client=request.auth_client_name or request.name,
+        )
 
-    return None
 
+# Compensating action for a completed creation step: (description, undo)
+Compensation = Tuple[str, Callable[[], Awaitable[Any]]]
 
-def _rollback_filesystem_creation(
-    name: str,
-    meta_pool: str,
-    data_pool: str,
-    created_meta: bool,
-    created_data: bool,
-    created_fs: bool,
-    created_auth: bool,
-    auth_client_name: Union[str, None],
-) -> None:
-    """Rollback filesystem creation on failure.
+
+async def _compensate(name: str, compensations: List[Compensation]) -> None:
+    """Undo completed filesystem creation steps in reverse order.
 
     Args:
         name: Filesystem name
-        meta_pool: Metadata pool name
-        data_pool: Data pool name
-        created_meta: Whether metadata pool was created
-        created_data: Whether data pool was created
-        created_fs: Whether filesystem was created
-        created_auth: Whether auth was created
-        auth_client_name: Client name for auth
+        compensations: Undo actions pushed after each successful step
     """
     logger.warning(f"Rolling back filesystem creation for '{name}'")
 
-    try:
-        # Remove filesystem if created
-        if created_fs:
-            logger.info(f"Removing filesystem '{name}'")
-            ceph_client.remove_filesystem(name)
-
-        # Remove auth if created
-        if created_auth and auth_client_name:
-            logger.info(f"Removing auth for client '{auth_client_name}'")
-            ceph_client.delete_auth_client(auth_client_name)
-
-        # Remove pools if created
-        if created_data:
-            logger.info(f"Removing data pool '{data_pool}'")
-            ceph_client.delete_pool(data_pool)
-
-        if created_meta:
-            logger.info(f"Removing metadata pool '{meta_pool}'")
-            ceph_client.delete_pool(meta_pool)
-
-    except Exception as e:
-        logger.error(f"Error during rollback: {e}")
+    for what, undo in reversed(compensations):
+        logger.info(f"Removing {what}")
+        try:
+            await undo()
+        except Exception as e:
+            logger.error(f"Error during rollback removing {what}: {e}")
 
 
 @router.post(
@@ -140,104 +163,137 @@ async def create_filesystem(
     Raises:
         HTTPException: On validation or execution errors
     """
-    # Track what we've created for rollback
-    created_meta = False
-    created_data = False
-    created_fs = False
-    created_auth = False
+    # Undo actions for each completed step, run in reverse on failure
+    compensations: List[Compensation] = []
 
-    meta_pool = f"cephfs.{request.name}.meta"
-    data_pool = f"cephfs.{request.name}.data"
-    auth_client_name = request.auth_client_name or request.name
+    layout = FsLayout.from_request(request)
 
     try:
+        # The precondition checks are independent, so run them concurrently
+        # Pool names are read fresh rather than from ceph_read_cache: a stale
+        # miss would let an existing pool be adopted and then rolled back
+        fs_exists, rule_exists, pool_names = await asyncio.gather(
+            ceph_client.filesystem_exists(layout.name),
+            ceph_client.crush_rule_exists(request.crush_rule),
+            ceph_client.list_pool_names(),
+        )
+        existing_pools = set(pool_names)
+
         # Check if filesystem already exists
-        if ceph_client.filesystem_exists(request.name):
+        if fs_exists:
             raise FilesystemAlreadyExistsError(
-                request.name,
-                {"metadata_pool": meta_pool, "data_pool": data_pool},
+                layout.name,
+                {"metadata_pool": layout.meta_pool, "data_pool": layout.data_pool},
             )
 
         # Validate CRUSH rule exists
-        if not ceph_client.crush_rule_exists(request.crush_rule):
+        if not rule_exists:
             raise InvalidCrushRuleError(request.crush_rule)
 
         # Check if pools already exist
-        if ceph_client.pool_exists(meta_pool):
+        if layout.meta_pool in existing_pools:
             raise FilesystemAlreadyExistsError(
-                request.name,
-                {"reason": f"Metadata pool '{meta_pool}' already exists"},
+                layout.name,
+                {"reason": f"Metadata pool '{layout.meta_pool}' already exists"},
             )
 
-        if ceph_client.pool_exists(data_pool):
+        if layout.data_pool in existing_pools:
             raise FilesystemAlreadyExistsError(
-                request.name,
-                {"reason": f"Data pool '{data_pool}' already exists"},
+                layout.name,
+                {"reason": f"Data pool '{layout.data_pool}' already exists"},
             )
 
-        logger.info(f"Creating filesystem '{request.name}' for user '{auth.user}'")
+        logger.info(f"Creating filesystem '{layout.name}' for user '{auth.user}'")
 
         # Step 1: Create metadata pool
-        logger.info(f"Creating metadata pool '{meta_pool}'")
-        ceph_client.create_pool(
-            pool_name=meta_pool,
+        logger.info(f"Creating metadata pool '{layout.meta_pool}'")
+        await ceph_client.create_pool(
+            pool_name=layout.meta_pool,
             pg_num=request.meta_pool_pg,
             pool_type="replicated",
             crush_rule=request.crush_rule,
         )
-        created_meta = True
+        compensations.append((
+            f"metadata pool '{layout.meta_pool}'",
+            lambda: ceph_client.delete_pool(layout.meta_pool),
+        ))
 
         # Step 2: Create data pool
-        logger.info(f"Creating data pool '{data_pool}'")
-        ceph_client.create_pool(
-            pool_name=data_pool,
+        logger.info(f"Creating data pool '{layout.data_pool}'")
+        await ceph_client.create_pool(
+            pool_name=layout.data_pool,
             pg_num=request.meta_pool_pg,  # Use same PG count
             pool_type=request.data_pool_type,
             crush_rule=request.crush_rule,
         )
-        created_data = True
+        compensations.append((
+            f"data pool '{layout.data_pool}'",
+            lambda: ceph_client.delete_pool(layout.data_pool),
+        ))
 
         # Step 3: Create filesystem
-        logger.info(f"Creating filesystem '{request.name}'")
-        ceph_client.create_filesystem(
-            name=request.name,
-            meta_pool=meta_pool,
-            data_pool=data_pool,
+        logger.info(f"Creating filesystem '{layout.name}'")
+        await ceph_client.create_filesystem(
+            name=layout.name,
+            meta_pool=layout.meta_pool,
+            data_pool=layout.data_pool,
         )
-        created_fs = True
+        compensations.append((
+            f"filesystem '{layout.name}'",
+            lambda: ceph_client.remove_filesystem(layout.name),
+        ))
+
+        # Steps 4 and 5 only depend on the filesystem, so run them concurrently
+        final_steps: List[Awaitable[Any]] = []
 
         # Step 4: Enable snapshots if requested
         if request.enable_snapshots:
-            logger.info(f"Enabling snapshots for '{request.name}'")
-            ceph_client.set_filesystem_flag(
-                name=request.name,
+            logger.info(f"Enabling snapshots for '{layout.name}'")
+            final_steps.append(ceph_client.set_filesystem_flag(
+                name=layout.name,
                 flag="allow_new_snaps",
                 value=True,
-            )
+            ))
 
         # Step 5: Create client auth if requested
-        auth_key = None
         if request.create_auth:
             logger.info(
-                f"Creating auth for client '{auth_client_name}' on '{request.name}'"
+                f"Creating auth for client '{layout.auth_client}' on '{layout.name}'"
             )
-            auth_key = ceph_client.authorize_filesystem_client(
-                filesystem=request.name,
-                client_name=auth_client_name,
+            final_steps.append(ceph_client.authorize_filesystem_client(
+                filesystem=layout.name,
+                client_name=layout.auth_client,
                 path="/",
                 permissions="rw",
-            )
-            created_auth = True
+            ))
+
+        results = await asyncio.gather(*final_steps, return_exceptions=True)
+
+        auth_key: Union[str, None] = None
+        if request.create_auth:
+            auth_result = results[-1]
+            if not isinstance(auth_result, BaseException):
+                auth_key = auth_result
+                compensations.append((
+                    f"auth for client '{layout.auth_client}'",
+                    lambda: ceph_client.delete_auth_client(layout.auth_client),
+                ))
+
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+        ceph_read_cache.invalidate("fs ls", "df")
 
         # Log successful operation
         audit_logger.log_operation(
             operation="CREATE",
-            resource=f"filesystem:{request.name}",
+            resource=f"filesystem:{layout.name}",
             user=auth.user,
             status="SUCCESS",
             details={
-                "metadata_pool": meta_pool,
-                "data_pool": data_pool,
+                "metadata_pool": layout.meta_pool,
+                "data_pool": layout.data_pool,
                 "crush_rule": request.crush_rule,
                 "snapshots_enabled": request.enable_snapshots,
                 "auth_created": request.create_auth,
@@ -245,34 +301,25 @@ async def create_filesystem(
         )
 
         response_data = CreateFilesystemResponse(
-            name=request.name,
-            metadata_pool=meta_pool,
-            data_pool=data_pool,
+            name=layout.name,
+            metadata_pool=layout.meta_pool,
+            data_pool=layout.data_pool,
             snapshots_enabled=request.enable_snapshots,
             auth_created=request.create_auth,
-            auth_client_name=auth_client_name if request.create_auth else None,
+            auth_client_name=layout.auth_client if request.create_auth else None,
             auth_key=auth_key,
         )
 
-        return APIResponse(status="success", data=response_data.model_dump())
+        return APIResponse(status="success", data=response_data)
 
     except CephAPIException:
         # Rollback on any Ceph API exception
-        _rollback_filesystem_creation(
-            name=request.name,
-            meta_pool=meta_pool,
-            data_pool=data_pool,
-            created_meta=created_meta,
-            created_data=created_data,
-            created_fs=created_fs,
-            created_auth=created_auth,
-            auth_client_name=auth_client_name,
-        )
+        await _compensate(layout.name, compensations)
 
         # Log failed operation
         audit_logger.log_operation(
             operation="CREATE",
-            resource=f"filesystem:{request.name}",
+            resource=f"filesystem:{layout.name}",
             user=auth.user,
             status="FAILED",
         )
@@ -281,22 +328,13 @@ async def create_filesystem(
 
     except Exception as e:
         # Rollback on unexpected errors
-        _rollback_filesystem_creation(
-            name=request.name,
-            meta_pool=meta_pool,
-            data_pool=data_pool,
-            created_meta=created_meta,
-            created_data=created_data,
-            created_fs=created_fs,
-            created_auth=created_auth,
-            auth_client_name=auth_client_name,
-        )
+        await _compensate(layout.name, compensations)
 
         logger.error(f"Unexpected error creating filesystem: {e}")
 
         audit_logger.log_operation(
             operation="CREATE",
-            resource=f"filesystem:{request.name}",
+            resource=f"filesystem:{layout.name}",
             user=auth.user,
             status="FAILED",
         )
@@ -317,7 +355,7 @@ async def create_filesystem(
 async def get_filesystem(
     name: str,
     auth: Annotated[AuthContext, Depends(require_fs_read)],
-) -> APIResponse:
+) -> ORJSONResponse:
     """Get information about a specific filesystem.
 
     Args:
@@ -333,23 +371,20 @@ async def get_filesystem(
     try:
         logger.info(f"Getting info for filesystem '{name}'")
 
-        # Get filesystem info
-        fs_info = ceph_client.get_filesystem_info(name)
-
-        # Get list of filesystems to extract additional info
-        fs_list = ceph_client.list_filesystems()
-        fs_data = next((fs for fs in fs_list if fs.get("name") == name), None)
+        # Every returned field comes from 'fs ls'; a missing entry means 404
+        filesystems = await ceph_read_cache.get("fs ls", _load_filesystems)
+        fs_data = filesystems.get(name)
 
         if not fs_data:
             raise FilesystemNotFoundError(name)
 
-        # Build response
-        response_data = FilesystemInfo(
-            name=fs_data.get("name", name),
-            metadata_pool=fs_data.get("metadata_pool", ""),
-            data_pools=fs_data.get("data_pools", []),
-            mds_count=fs_data.get("mds_count", 0),
-        )
+        # Build the FilesystemInfo payload directly; it is only serialized
+        response_data = {
+            "name": fs_data.get("name", name),
+            "metadata_pool": fs_data.get("metadata_pool", ""),
+            "data_pools": fs_data.get("data_pools", []),
+            "mds_count": fs_data.get("mds_count", 0),
+        }
 
         audit_logger.log_operation(
             operation="READ",
@@ -358,7 +393,7 @@ async def get_filesystem(
             status="SUCCESS",
         )
 
-        return APIResponse(status="success", data=response_data.model_dump())
+        return ORJSONResponse({"status": "success", "data": response_data})
 
     except FilesystemNotFoundError:
         audit_logger.log_operation(
@@ -380,7 +415,7 @@ async def get_filesystem(
 async def get_filesystem_usage(
     name: str,
     auth: Annotated[AuthContext, Depends(require_fs_read)],
-) -> APIResponse:
+) -> ORJSONResponse:
     """Get usage statistics for a filesystem.
 
     Returns stored_bytes (before replication) for accurate billing.
@@ -399,14 +434,14 @@ async def get_filesystem_usage(
         logger.info(f"Getting usage for filesystem '{name}'")
 
         # Get filesystem info to find data pool
-        fs_list = ceph_client.list_filesystems()
-        fs_data = next((fs for fs in fs_list if fs.get("name") == name), None)
+        filesystems = await ceph_read_cache.get("fs ls", _load_filesystems)
+        fs_data = filesystems.get(name)
 
         if not fs_data:
             raise FilesystemNotFoundError(name)
 
         # Get cluster df data
-        df_data = ceph_client.get_cluster_df()
+        pools_by_name = await ceph_read_cache.get("df", _load_pools)
 
         # Extract data pool name (use first data pool)
         data_pools = fs_data.get("data_pools", [])
@@ -420,7 +455,7 @@ async def get_filesystem_usage(
         data_pool = data_pools[0]
 
         # Get pool usage
-        usage = _get_pool_usage(data_pool, df_data)
+        usage = _get_pool_usage(data_pool, pools_by_name)
 
         if not usage:
             raise CephCommandFailedError(
@@ -429,10 +464,7 @@ async def get_filesystem_usage(
                 stderr=f"Pool '{data_pool}' not found in df output",
             )
 
-        response_data = FilesystemUsageResponse(
-            name=name,
-            usage=usage,
-        )
+        response_data = {"name": name, "usage": usage}
 
         audit_logger.log_operation(
             operation="READ",
@@ -441,7 +473,7 @@ async def get_filesystem_usage(
             status="SUCCESS",
         )
 
-        return APIResponse(status="success", data=response_data.model_dump())
+        return ORJSONResponse({"status": "success", "data": response_data})
 
     except FilesystemNotFoundError:
         audit_logger.log_operation(
@@ -453,6 +485,38 @@ async def get_filesystem_usage(
         raise
 
 
+async def _stream_filesystems(
+    filesystems: List[Dict[str, Any]],
+    pools_by_name: Union[Dict[str, Dict[str, Any]], None],
+) -> AsyncIterator[bytes]:
+    """Encode a ListFilesystemsResponse envelope one filesystem at a time.
+
+    Args:
+        filesystems: Entries from 'ceph fs ls'
+        pools_by_name: Pools from 'ceph df detail' indexed by name, or None to
+            omit usage statistics
+
+    Yields:
+        Fragments of the JSON response body
+    """
+    yield b'{"status":"success","data":{"filesystems":['
+    for i, fs_data in enumerate(filesystems):
+        data_pools = fs_data.get("data_pools", [])
+        usage = None
+        if pools_by_name and data_pools:
+            usage = _get_pool_usage(data_pools[0], pools_by_name)
+
+        entry = orjson.dumps({
+            "name": fs_data.get("name", ""),
+            "metadata_pool": fs_data.get("metadata_pool", ""),
+            "data_pools": data_pools,
+            "mds_count": fs_data.get("mds_count", 0),
+            "usage": usage,
+        })
+        yield b"," + entry if i else entry
+    yield b'],"count":%d}}' % len(filesystems)
+
+
 @router.get(
     "/fs",
     response_model=APIResponse,
@@ -463,7 +527,7 @@ async def get_filesystem_usage(
 async def list_filesystems(
     auth: Annotated[AuthContext, Depends(require_fs_read)],
     include_usage: Annotated[bool, Query(description="Include usage statistics")] = False,
-) -> APIResponse:
+) -> StreamingResponse:
     """List all CephFS filesystems.
 
     Args:
@@ -480,36 +544,14 @@ async def list_filesystems(
         logger.info(f"Listing filesystems (include_usage={include_usage})")
 
         # Get filesystem list
-        fs_list = ceph_client.list_filesystems()
+        fs_by_name = await ceph_read_cache.get("fs ls", _load_filesystems)
 
         # Get usage data if requested
-        df_data = None
+        pools_by_name = None
         if include_usage:
-            df_data = ceph_client.get_cluster_df()
-
-        # Build response
-        filesystems = []
-        for fs_data in fs_list:
-            fs_info = FilesystemWithUsage(
-                name=fs_data.get("name", ""),
-                metadata_pool=fs_data.get("metadata_pool", ""),
-                data_pools=fs_data.get("data_pools", []),
-                mds_count=fs_data.get("mds_count", 0),
-            )
-
-            # Add usage if requested
-            if include_usage and df_data:
-                data_pools = fs_data.get("data_pools", [])
-                if data_pools:
-                    usage = _get_pool_usage(data_pools[0], df_data)
-                    fs_info.usage = usage
+            pools_by_name = await ceph_read_cache.get("df", _load_pools)
 
-            filesystems.append(fs_info)
-
-        response_data = ListFilesystemsResponse(
-            filesystems=filesystems,
-            count=len(filesystems),
-        )
+        filesystems = list(fs_by_name.values())
 
         audit_logger.log_operation(
             operation="READ",
@@ -519,7 +561,10 @@ async def list_filesystems(
             details={"include_usage": include_usage, "count": len(filesystems)},
         )
 
-        return APIResponse(status="success", data=response_data.model_dump())
+        return StreamingResponse(
+            _stream_filesystems(filesystems, pools_by_name),
+            media_type="application/json",
+        )
 
     except CephCommandFailedError:
         audit_logger.log_operation(
@@ -568,17 +613,18 @@ async def delete_filesystem(
         logger.info(f"Deleting filesystem '{name}' for user '{auth.user}'")
 
         # Check if filesystem exists
-        if not ceph_client.filesystem_exists(name):
+        if not await ceph_client.filesystem_exists(name):
             raise FilesystemNotFoundError(name)
 
         # Delete client auth if requested
         if delete_auth:
             logger.info(f"Deleting auth for client '{name}'")
-            ceph_client.delete_auth_client(name)
+            await ceph_client.delete_auth_client(name)
 
         # Remove filesystem
         logger.info(f"Removing filesystem '{name}'")
-        ceph_client.remove_filesystem(name)
+        await ceph_client.remove_filesystem(name)
+        ceph_read_cache.invalidate("fs ls", "df")
 
         audit_logger.log_operation(
             operation="DELETE",
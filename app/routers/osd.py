@@ -1,20 +1,30 @@
 """OSD management endpoints."""
 
+import errno
 import logging
-from typing import Annotated, Any, Dict
+from typing import Annotated, Any, Dict, List, Tuple, Union
 
 from fastapi import APIRouter, Depends
+from fastapi.responses import ORJSONResponse
 
 from app.core.auth import AuthContext, verify_api_key
-from app.core.exceptions import OSDNotFoundError
+from app.core.exceptions import CephCommandFailedError, OSDNotFoundError
 from app.core.logging import audit_logger
-from app.models.osd import OSDFlagRequest, OSDFlagResponse, OSDStatusResponse
+from app.models.osd import ALLOWED_OSD_FLAGS, OSDFlagRequest, OSDFlagResponse
+from app.services.ceph_cache import ceph_read_cache
 from app.services.ceph_client import ceph_client
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="", tags=["OSD"])
 
+# Ceph command for every allowed (flag, action) pair, built once at import
+_OSD_FLAG_COMMANDS: Dict[Tuple[str, str], List[str]] = {
+    (flag, action): ["osd", action, flag]
+    for flag in ALLOWED_OSD_FLAGS
+    for action in ("set", "unset")
+}
+
 
 async def require_osd_read(
     auth: Annotated[AuthContext, Depends(verify_api_key)],
@@ -30,39 +40,95 @@ async def require_osd_write(
     return auth
 
 
-@router.get("/{osd_id}/status", response_model=Dict[str, Any])
-async def get_osd_status(
-    osd_id: int,
-    auth: Annotated[AuthContext, Depends(require_osd_read)],
-) -> Dict[str, Any]:
-    """Get the UP/IN status of a specific OSD."""
-    osd_dump = ceph_client.execute_command(
+async def _load_osds() -> Dict[int, Dict[str, Any]]:
+    """Load OSD entries from 'ceph osd dump' indexed by OSD id."""
+    osd_dump = await ceph_client.execute_command(
         ["osd", "dump", "--format", "json"],
         parse_json=True,
     )
+    return {osd.get("osd"): osd for osd in osd_dump.get("osds", [])}
+
+
+async def _load_osd(osd_id: int) -> Union[Dict[str, Any], None]:
+    """Load a single OSD entry with 'ceph osd info'.
+
+    Args:
+        osd_id: OSD id
+
+    Returns:
+        The OSD entry, or None if the OSD does not exist
+
+    Raises:
+        CephCommandFailedError: If the command fails for another reason
+    """
+    try:
+        info: Union[Dict[str, Any], List[Dict[str, Any]]] = await ceph_client.mon_command(
+            "osd info", id=f"osd.{osd_id}"
+        )
+    except CephCommandFailedError as e:
+        # librados reports -ENOENT, the ceph CLI exits with ENOENT
+        if abs(e.details.get("exit_code", 0)) == errno.ENOENT:
+            return None
+        raise
+
+    # Without an id filter some releases return a list of entries
+    if isinstance(info, list):
+        return next((osd for osd in info if osd.get("osd") == osd_id), None)
+    return info
+
+
+async def _find_osd(osd_id: int) -> Union[Dict[str, Any], None]:
+    """Find an OSD entry, querying only that OSD when no dump is cached.
 
-    for osd_entry in osd_dump.get("osds", []):
-        if osd_entry.get("osd") == osd_id:
-            response_data = OSDStatusResponse(
-                osd=osd_id,
-                up=osd_entry.get("up", 0),
-                **{"in": osd_entry.get("in", 0)},
-            )
+    A fresh cached 'osd dump' is used as-is. Otherwise 'osd info' fetches just
+    the requested OSD instead of the whole map; releases without 'osd info'
+    fall back to the cached dump.
 
-            audit_logger.log_operation(
-                operation="READ",
-                resource=f"osd:{osd_id}",
-                user=auth.user,
-                status="SUCCESS",
-                details={"up": response_data.up, "in": response_data.in_},
-            )
+    Args:
+        osd_id: OSD id
 
-            return {
-                "status": "success",
-                "data": response_data.model_dump(by_alias=True),
-            }
+    Returns:
+        The OSD entry, or None if the OSD does not exist
+    """
+    osds_by_id: Union[Dict[int, Dict[str, Any]], None] = ceph_read_cache.peek("osd dump")
+    if osds_by_id is None:
+        try:
+            return await _load_osd(osd_id)
+        except CephCommandFailedError as e:
+            if e.is_unavailable:
+                raise
+            logger.info(f"'osd info' failed, falling back to 'osd dump': {e.details}")
+        osds_by_id = await ceph_read_cache.get("osd dump", _load_osds)
 
-    raise OSDNotFoundError(osd_id)
+    return osds_by_id.get(osd_id)
+
+
+@router.get("/{osd_id}/status", response_model=Dict[str, Any])
+async def get_osd_status(
+    osd_id: int,
+    auth: Annotated[AuthContext, Depends(require_osd_read)],
+) -> ORJSONResponse:
+    """Get the UP/IN status of a specific OSD."""
+    osd_entry = await _find_osd(osd_id)
+    if osd_entry is None:
+        raise OSDNotFoundError(osd_id)
+
+    # OSDStatusResponse fields, serialized directly without model validation
+    response_data = {
+        "osd": osd_id,
+        "up": osd_entry.get("up", 0),
+        "in": osd_entry.get("in", 0),
+    }
+
+    audit_logger.log_operation(
+        operation="READ",
+        resource=f"osd:{osd_id}",
+        user=auth.user,
+        status="SUCCESS",
+        details={"up": response_data["up"], "in": response_data["in"]},
+    )
+
+    return ORJSONResponse({"status": "success", "data": response_data})
 
 
 @router.post("/flags", response_model=Dict[str, Any])
@@ -71,9 +137,7 @@ async def set_osd_flag(
     auth: Annotated[AuthContext, Depends(require_osd_write)],
 ) -> Dict[str, Any]:
     """Set or unset a cluster-wide OSD flag."""
-    ceph_client.execute_command(
-        ["osd", request.action, request.flag],
-    )
+    await ceph_client.execute_command(_OSD_FLAG_COMMANDS[(request.flag, request.action)])
 
     message = f"{request.flag} is {request.action}"
     response_data = OSDFlagResponse(ok=True, message=message)
@@ -88,5 +152,5 @@ async def set_osd_flag(
 
     return {
         "status": "success",
-        "data": response_data.model_dump(),
+        "data": response_data,
     }
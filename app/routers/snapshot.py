@@ -4,7 +4,8 @@ import logging
 from typing import Any, List, Union
 
 from fastapi import APIRouter, HTTPException, Query, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel
 
 from app.core.exceptions import (
     CephAPIException,
@@ -19,6 +20,7 @@ from app.models.snapshot import (
     AddSnapshotScheduleResponse,
     ListSnapshotSchedulesResponse,
     SnapshotScheduleInfo,
+    SnapshotScheduleRetention,
 )
 from app.services.ceph_client import ceph_client
 
@@ -27,6 +29,16 @@ logger = logging.getLogger(__name__)
 router = APIRouter(tags=["Snapshots"])
 
 
+# Retention units from API format to Ceph format
+_RETENTION_UNIT_MAP = {
+    "hourly": "h",
+    "daily": "d",
+    "weekly": "w",
+    "monthly": "m",
+    "yearly": "y",
+}
+
+
 def _map_retention_unit(unit: str) -> str:
     """Map retention unit from API format to Ceph format.
 
@@ -36,35 +48,38 @@ def _map_retention_unit(unit: str) -> str:
     Returns:
         Ceph unit code (h, d, w, m, y)
     """
-    mapping = {
-        "hourly": "h",
-        "daily": "d",
-        "weekly": "w",
-        "monthly": "m",
-        "yearly": "y",
-    }
-    return mapping.get(unit, unit)
+    return _RETENTION_UNIT_MAP.get(unit, unit)
+
+
+def _success_response(
+    response_data: BaseModel,
+    status_code: int = status.HTTP_200_OK,
+) -> ORJSONResponse:
+    """Wrap response data in the success envelope.
+
+    Args:
+        response_data: Response payload model
+        status_code: HTTP status code
+
+    Returns:
+        ORJSONResponse with the success envelope
+    """
+    return ORJSONResponse(
+        status_code=status_code,
+        content={"status": "success", "data": response_data.model_dump(exclude_none=True)},
+    )
 
 
-def _handle_api_exception(e: CephAPIException) -> JSONResponse:
+def _handle_api_exception(e: CephAPIException) -> ORJSONResponse:
     """Convert API exceptions to JSON responses.
 
     Args:
         e: CephAPIException to convert
 
     Returns:
-        JSONResponse with error details
+        ORJSONResponse with error details
     """
-    response_data = APIResponse(
-        status="error",
-        code=e.code,
-        message=e.message,
-        details=e.details,
-    )
-    return JSONResponse(
-        status_code=e.status_code,
-        content=response_data.model_dump(exclude_none=True),
-    )
+    return ORJSONResponse(status_code=e.status_code, content=e.to_dict())
 
 
 @router.post(
@@ -94,7 +109,7 @@ def _handle_api_exception(e: CephAPIException) -> JSONResponse:
 async def add_snapshot_schedule(
     name: str,
     request: AddSnapshotScheduleRequest,
-) -> JSONResponse:
+) -> Response:
     """Add a snapshot schedule to a CephFS filesystem.
 
     Args:
@@ -109,7 +124,7 @@ async def add_snapshot_schedule(
     """
     try:
         # Verify filesystem exists
-        if not ceph_client.filesystem_exists(name):
+        if not await ceph_client.filesystem_exists(name):
             raise FilesystemNotFoundError(name)
 
         # Build base command
@@ -124,28 +139,30 @@ async def add_snapshot_schedule(
 
         # Execute add schedule command
         logger.info(f"Adding snapshot schedule for {name}:{request.path} - {request.schedule}")
-        ceph_client.execute_command(cmd)
+        await ceph_client.execute_command(cmd)
 
-        # Add retention policies if provided
+        # Add retention policies if provided, all units in one compound spec
+        # (e.g. "24h7d") rather than one command per unit
         if request.retention:
-            for unit, count in request.retention.model_dump(exclude_none=True).items():
-                if count is not None:
-                    retention_unit = _map_retention_unit(unit)
-                    retention_cmd = [
-                        "fs",
-                        "snap-schedule",
-                        "retention",
-                        "add",
-                        request.path,
-                        retention_unit,
-                        str(count),
-                        "--fs",
-                        name,
-                    ]
-                    logger.info(
-                        f"Adding retention policy: {retention_unit}={count} for {name}:{request.path}"
-                    )
-                    ceph_client.execute_command(retention_cmd)
+            retention_spec = "".join(
+                f"{count}{_map_retention_unit(unit)}"
+                for unit, count in request.retention.model_dump(exclude_none=True).items()
+            )
+            if retention_spec:
+                retention_cmd = [
+                    "fs",
+                    "snap-schedule",
+                    "retention",
+                    "add",
+                    request.path,
+                    retention_spec,
+                    "--fs",
+                    name,
+                ]
+                logger.info(
+                    "Adding retention policy: %s for %s:%s", retention_spec, name, request.path
+                )
+                await ceph_client.execute_command(retention_cmd)
 
         # Create response
         response_data = AddSnapshotScheduleResponse(
@@ -156,13 +173,7 @@ async def add_snapshot_schedule(
             fs_name=name,
         )
 
-        return JSONResponse(
-            status_code=status.HTTP_201_CREATED,
-            content=APIResponse(
-                status="success",
-                data=response_data.model_dump(exclude_none=True),
-            ).model_dump(exclude_none=True),
-        )
+        return _success_response(response_data, status.HTTP_201_CREATED)
 
     except CephAPIException as e:
         logger.error(f"Failed to add snapshot schedule: {e.message}")
@@ -194,7 +205,7 @@ async def add_snapshot_schedule(
 async def get_snapshot_schedules(
     name: str,
     path: str = Query(default="/", description="CephFS path to query"),
-) -> JSONResponse:
+) -> Response:
     """Get snapshot schedules for a CephFS filesystem path.
 
     Args:
@@ -209,34 +220,32 @@ async def get_snapshot_schedules(
     """
     try:
         # Verify filesystem exists
-        if not ceph_client.filesystem_exists(name):
+        if not await ceph_client.filesystem_exists(name):
             raise FilesystemNotFoundError(name)
 
         # Build command
         cmd = ["fs", "snap-schedule", "status", path, "--fs", name, "--format", "json"]
 
-        # Execute command
+        # Execute command; the response is a list of schedule objects,
+        # parsed as it streams in
         logger.info(f"Getting snapshot schedules for {name}:{path}")
-        result = ceph_client.execute_command(cmd, parse_json=True)
-
-        # Parse response - it's a list of schedule objects
         schedules: List[SnapshotScheduleInfo] = []
-        if isinstance(result, list):
-            for item in result:
-                # Parse retention if present
-                retention = None
-                if "retention" in item and item["retention"]:
-                    retention = item["retention"]
-
-                schedules.append(
-                    SnapshotScheduleInfo(
-                        path=item.get("path", path),
-                        schedule=item.get("schedule", ""),
-                        retention=retention,
-                        start=item.get("start"),
-                        subvol=item.get("subvol"),
-                    )
+        async for item in ceph_client.execute_command_stream(cmd):
+            # Parse retention if present
+            retention = None
+            if item.get("retention"):
+                retention = SnapshotScheduleRetention.model_construct(**item["retention"])
+
+            # Ceph's own output is trusted, so skip per-field validation
+            schedules.append(
+                SnapshotScheduleInfo.model_construct(
+                    path=item.get("path", path),
+                    schedule=item.get("schedule", ""),
+                    retention=retention,
+                    start=item.get("start"),
+                    subvol=item.get("subvol"),
                 )
+            )
 
         # Create response
         response_data = ListSnapshotSchedulesResponse(
@@ -245,31 +254,19 @@ async def get_snapshot_schedules(
             fs_name=name,
         )
 
-        return JSONResponse(
-            status_code=status.HTTP_200_OK,
-            content=APIResponse(
-                status="success",
-                data=response_data.model_dump(exclude_none=True),
-            ).model_dump(exclude_none=True),
-        )
+        return _success_response(response_data)
 
     except CephCommandFailedError as e:
         # If no schedules exist, Ceph might return an error
         # Treat this as empty list
-        if "not found" in e.details.get("stderr", "").lower():
+        if e.is_not_found:
             logger.info(f"No schedules found for {name}:{path}")
             response_data = ListSnapshotSchedulesResponse(
                 schedules=[],
                 count=0,
                 fs_name=name,
             )
-            return JSONResponse(
-                status_code=status.HTTP_200_OK,
-                content=APIResponse(
-                    status="success",
-                    data=response_data.model_dump(exclude_none=True),
-                ).model_dump(exclude_none=True),
-            )
+            return _success_response(response_data)
         logger.error(f"Failed to get snapshot schedules: {e.message}")
         return _handle_api_exception(e)
     except CephAPIException as e:
@@ -306,7 +303,7 @@ async def remove_snapshot_schedule(
         default=None,
         description="Specific schedule to remove (omit to remove all)",
     ),
-) -> JSONResponse:
+) -> Response:
     """Remove a snapshot schedule from a CephFS filesystem path.
 
     Args:
@@ -322,7 +319,7 @@ async def remove_snapshot_schedule(
     """
     try:
         # Verify filesystem exists
-        if not ceph_client.filesystem_exists(name):
+        if not await ceph_client.filesystem_exists(name):
             raise FilesystemNotFoundError(name)
 
         # Build command
@@ -337,14 +334,13 @@ async def remove_snapshot_schedule(
 
         # Execute command
         logger.info(f"Removing snapshot schedule for {name}:{path} schedule={schedule}")
-        ceph_client.execute_command(cmd)
+        await ceph_client.execute_command(cmd)
 
-        return JSONResponse(status_code=status.HTTP_204_NO_CONTENT, content=None)
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
 
     except CephCommandFailedError as e:
         # Check if it's a "not found" error
-        stderr = e.details.get("stderr", "").lower()
-        if "not found" in stderr or "does not exist" in stderr:
+        if e.is_not_found:
             logger.error(f"Schedule not found: {name}:{path} schedule={schedule}")
             raise_error = SnapshotScheduleNotFoundError(path=path, schedule=schedule)
             return _handle_api_exception(raise_error)
@@ -382,7 +378,7 @@ async def list_snapshots(
     path: str = Query(default="/", description="CephFS path to query"),
     limit: int = Query(default=100, ge=1, le=1000, description="Maximum snapshots to return"),
     recursive: bool = Query(default=False, description="Search recursively"),
-) -> JSONResponse:
+) -> Response:
     """List snapshots in a CephFS filesystem path.
 
     This endpoint is not yet implemented. It requires either:
@@ -424,7 +420,7 @@ async def list_snapshots(
         },
     )
 
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_501_NOT_IMPLEMENTED,
         content=response_data.model_dump(exclude_none=True),
     )
@@ -0,0 +1,91 @@
+"""Short-lived cache for read-only Ceph queries.
+
+Several endpoints issue the same cluster-wide queries (``fs ls``, ``df``,
+``osd dump``), often more than once per request. Results are kept for a few
+seconds and concurrent callers for the same key share a single Ceph call.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CephReadCache:
+    """TTL cache for read-only Ceph query results."""
+
+    def __init__(self, ttl_seconds: float = 3.0, maxsize: int = 16) -> None:
+        """Initialize the cache.
+
+        Args:
+            ttl_seconds: How long a result stays valid
+            maxsize: Maximum number of cached keys
+        """
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def get(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached result for ``key``, loading it if needed.
+
+        Only one caller loads a given key at a time; the others wait for its
+        result. Failures are not cached.
+
+        Args:
+            key: Cache key identifying the query
+            loader: Coroutine function producing the result
+
+        Returns:
+            The query result
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+
+            value = await loader()
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            return value
+
+    def peek(self, key: str) -> Any:
+        """Return the cached result for ``key`` without loading it.
+
+        Args:
+            key: Cache key identifying the query
+
+        Returns:
+            The cached result, or None if absent or expired
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def invalidate(self, *keys: str) -> None:
+        """Drop cached results after a write changes them.
+
+        Args:
+            *keys: Keys to drop
+        """
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        self._entries.clear()
+        self._locks.clear()
+
+
+# Global cache instance
+ceph_read_cache = CephReadCache()
@@ -1,16 +1,96 @@
 """Ceph command execution client."""
 
+import asyncio
+import errno
 import json
 import logging
-import subprocess
-from typing import Any, Dict, List, Union
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Dict, FrozenSet, List, Tuple, Union
+
+import orjson
 
 from app.core.config import get_settings
 from app.core.exceptions import CephCommandFailedError
+from app.services.ceph_cache import ceph_read_cache
+
+try:
+    import rados
+    RADOS_AVAILABLE = True
+except ImportError:
+    RADOS_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
 
+# Bytes read from a streamed command before handing its output to ijson
+_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class _PrefixedReader:
+    """Async reader over a process pipe that replays its first chunk.
+
+    Reads share a budget of ``timeout`` seconds. Only time spent waiting on
+    the process counts against it, not time the consumer spends between reads.
+    """
+
+    def __init__(self, stream: asyncio.StreamReader, timeout: float) -> None:
+        self.head = b""
+        self._pending = b""
+        self._stream = stream
+        self._budget = timeout
+
+    async def prime(self, n: int) -> None:
+        """Read the first chunk of the stream, to be replayed by ``read``."""
+        self.head = self._pending = await self.timed(self._stream.read(n))
+
+    async def timed(self, aw: Awaitable[Any]) -> Any:
+        """Await ``aw`` against the remaining budget.
+
+        Raises:
+            TimeoutError: If the budget runs out first
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        try:
+            async with asyncio.timeout(max(self._budget, 0.0)):
+                return await aw
+        finally:
+            self._budget -= loop.time() - start
+
+    async def read(self, n: int = -1) -> bytes:
+        # ijson probes the stream type with read(0)
+        if self._pending and n != 0:
+            chunk, self._pending = self._pending, b""
+            return chunk
+        data: bytes = await self.timed(self._stream.read(n))
+        return data
+
+
+def _is_blank(output: bytes) -> bool:
+    """Check for empty command output without copying it as ``strip()`` would."""
+    return not output or output.isspace()
+
+
+def _cli_args(args: Dict[str, Any]) -> List[str]:
+    """Convert named monitor command arguments to ``ceph`` CLI arguments."""
+    argv: List[str] = []
+    for key, value in args.items():
+        if isinstance(value, bool):
+            if value:
+                argv.append(f"--{key.replace('_', '-')}")
+        elif isinstance(value, list):
+            argv.extend(str(item) for item in value)
+        else:
+            argv.append(str(value))
+    return argv
+
+
 class CephClient:
     """Client for executing Ceph commands."""
 
@@ -18,12 +98,144 @@ class CephClient:
         """Initialize Ceph client with configuration."""
         self.settings = get_settings()
         self.timeout = self.settings.ceph_command_timeout
+        # CLI arguments shared by every command, matching the librados identity
+        self._argv_prefix: Tuple[str, ...] = (
+            "ceph",
+            "--conf", self.settings.ceph_config_file,
+            "--id", self.settings.ceph_user,
+            "--keyring", self.settings.ceph_keyring,
+            "--connect-timeout", str(self.settings.ceph_connect_timeout),
+        )
+        self._pool: Union["asyncio.Queue[Any]", None] = None
+        # Running coalesced read commands, keyed by their arguments
+        self._inflight: Dict[Tuple[Any, ...], "asyncio.Future[Any]"] = {}
+
+    def connect(self) -> None:
+        """Open a pool of persistent librados connections for monitor commands.
+
+        Each connection keeps its own authenticated monitor session, so
+        concurrent commands do not queue behind a single session. Without the
+        ``rados`` bindings, or if no connection can be opened, monitor commands
+        keep using the ``ceph`` CLI.
+        """
+        if not RADOS_AVAILABLE or self._pool is not None:
+            return
+
+        pool: "asyncio.Queue[Any]" = asyncio.Queue()
+        for _ in range(self.settings.ceph_connection_pool_size):
+            cluster = rados.Rados(
+                conffile=self.settings.ceph_config_file,
+                rados_id=self.settings.ceph_user,
+                conf={"keyring": self.settings.ceph_keyring},
+            )
+            try:
+                cluster.connect(timeout=self.timeout)
+            except rados.Error as e:
+                logger.warning(f"librados connection failed: {e}")
+                # Release the failed handle's threads and sockets
+                cluster.shutdown()
+                break
+            pool.put_nowait(cluster)
+
+        if pool.empty():
+            logger.warning("No librados connections available, using ceph CLI")
+            return
+
+        self._pool = pool
+        logger.info(
+            f"Connected to Ceph cluster via librados ({pool.qsize()} connections)"
+        )
+
+    def shutdown(self) -> None:
+        """Close all pooled librados connections."""
+        pool, self._pool = self._pool, None
+        while pool is not None and not pool.empty():
+            pool.get_nowait().shutdown()
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[Any]:
+        """Borrow a pooled librados connection.
+
+        Waits on the event loop until a connection is free, so a request
+        queued for a connection does not hold an executor thread, and returns
+        it to the pool on exit.
+
+        Yields:
+            A connected ``rados.Rados`` handle, or None when not connected
+        """
+        pool = self._pool
+        if pool is None:
+            yield None
+            return
+
+        cluster = await pool.get()
+        try:
+            yield cluster
+        finally:
+            pool.put_nowait(cluster)
 
-    def execute_command(
+    async def mon_command(self, prefix: str, **args: Any) -> Any:
+        """Run a monitor command and return its parsed JSON output.
+
+        Uses a pooled librados connection when available, avoiding a ``ceph``
+        process per call; otherwise falls back to the CLI, passing ``args`` as
+        positional arguments in order. List values expand to several
+        arguments and boolean values become ``--flag-name`` switches.
+
+        Args:
+            prefix: Monitor command prefix (e.g., 'mon dump')
+            **args: Command arguments
+
+        Returns:
+            Parsed JSON output
+
+        Raises:
+            CephCommandFailedError: If the command fails
+        """
+        if self._pool is None:
+            return await self.execute_command(
+                prefix.split() + _cli_args(args) + ["--format", "json"],
+                parse_json=True,
+            )
+
+        cmd = {"prefix": prefix, "format": "json", **args}
+        logger.info("Executing mon command: %s", prefix)
+        try:
+            async with self.session() as cluster:
+                ret, outbuf, outs = await asyncio.to_thread(
+                    cluster.mon_command, json.dumps(cmd), b"", timeout=self.timeout
+                )
+        except rados.Error as e:
+            raise CephCommandFailedError(
+                command=f"ceph {prefix}",
+                exit_code=-1,
+                stderr=str(e),
+                unavailable=isinstance(e, rados.TimedOut),
+            ) from e
+
+        if ret != 0:
+            logger.error("Mon command failed with code %s: %s", ret, outs)
+            raise CephCommandFailedError(
+                command=f"ceph {prefix}",
+                exit_code=ret,
+                stderr=outs.strip(),
+            )
+
+        try:
+            return {} if _is_blank(outbuf) else orjson.loads(outbuf)
+        except orjson.JSONDecodeError as e:
+            raise CephCommandFailedError(
+                command=f"ceph {prefix}",
+                exit_code=1,
+                stderr=f"Invalid JSON output: {e}",
+            ) from e
+
+    async def execute_command(
         self,
         command: List[str],
         parse_json: bool = False,
         check: bool = True,
+        coalesce: bool = False,
     ) -> Union[Dict[str, Any], str]:
         """Execute a Ceph command and return the result.
 
@@ -31,6 +243,9 @@ class CephClient:
             command: Command to execute as list of arguments
             parse_json: Whether to parse JSON output
             check: Whether to raise exception on non-zero exit code
+            coalesce: Share one process and its result with concurrent
+                identical calls. Only for read-only commands; callers must
+                not modify the returned value.
 
         Returns:
             Parsed JSON dict if parse_json=True, otherwise stdout string
@@ -38,54 +253,152 @@ class CephClient:
         Raises:
             CephCommandFailedError: If command execution fails and check=True
         """
-        full_command = ["ceph"] + command
+        if not coalesce:
+            return await self._run_command(command, parse_json, check)
+
+        key = (tuple(command), parse_json, check)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run_command(command, parse_json, check))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # A cancelled caller must not cancel the command for the others
+        return await asyncio.shield(task)
+
+    async def _run_command(
+        self,
+        command: List[str],
+        parse_json: bool,
+        check: bool,
+    ) -> Union[Dict[str, Any], str]:
+        """Run a Ceph command in a subprocess (see ``execute_command``)."""
+        full_command = (*self._argv_prefix, *command)
 
-        logger.info(f"Executing Ceph command: {' '.join(full_command)}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Executing Ceph command: %s", " ".join(full_command))
 
+        proc = await asyncio.create_subprocess_exec(
+            *full_command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
         try:
-            result = subprocess.run(
-                full_command,
-                capture_output=True,
-                text=True,
-                timeout=self.timeout,
-                check=False,
+            # Keep stdout as bytes so JSON output can be parsed without decoding
+            stdout, stderr_bytes = await asyncio.wait_for(
+                proc.communicate(), timeout=self.timeout
             )
+        except asyncio.TimeoutError as e:
+            proc.kill()
+            await proc.wait()
+            logger.error("Command timed out after %s seconds", self.timeout)
+            raise CephCommandFailedError(
+                command=" ".join(full_command),
+                exit_code=-1,
+                stderr=f"Command timed out after {self.timeout} seconds",
+                unavailable=True,
+            ) from e
 
-            if check and result.returncode != 0:
-                logger.error(
-                    f"Command failed with exit code {result.returncode}: "
-                    f"{result.stderr}"
-                )
+        # communicate() only returns once the process has exited
+        assert proc.returncode is not None
+        if check and proc.returncode != 0:
+            stderr = stderr_bytes.decode(errors="replace")
+            logger.error("Command failed with exit code %s: %s", proc.returncode, stderr)
+            raise CephCommandFailedError(
+                command=" ".join(full_command),
+                exit_code=proc.returncode,
+                stderr=stderr.strip(),
+            )
+
+        if parse_json:
+            try:
+                return {} if _is_blank(stdout) else orjson.loads(stdout)
+            except orjson.JSONDecodeError as e:
+                logger.error("Failed to parse JSON output: %r", stdout)
                 raise CephCommandFailedError(
                     command=" ".join(full_command),
-                    exit_code=result.returncode,
-                    stderr=result.stderr.strip(),
-                )
+                    exit_code=1,
+                    stderr=f"Invalid JSON output: {e}",
+                ) from e
 
-            stdout = result.stdout.strip()
+        return stdout.decode(errors="replace").strip()
 
-            if parse_json:
-                try:
-                    return json.loads(stdout) if stdout else {}
-                except json.JSONDecodeError as e:
-                    logger.error(f"Failed to parse JSON output: {stdout}")
-                    raise CephCommandFailedError(
-                        command=" ".join(full_command),
-                        exit_code=1,
-                        stderr=f"Invalid JSON output: {e}",
-                    )
+    async def execute_command_stream(self, command: List[str]) -> AsyncIterator[Any]:
+        """Execute a Ceph command and yield the items of its JSON array output.
+
+        With ``ijson`` installed, items are parsed incrementally from the
+        process output, so the whole document is never held in memory.
+        Otherwise the output is parsed in one go. Output that is empty or not
+        an array yields nothing.
+
+        Args:
+            command: Command to execute as list of arguments
 
-            return stdout
+        Yields:
+            Each element of the top-level JSON array
 
-        except subprocess.TimeoutExpired as e:
-            logger.error(f"Command timed out after {self.timeout} seconds")
+        Raises:
+            CephCommandFailedError: If the command fails or its output is invalid
+        """
+        if not IJSON_AVAILABLE:
+            result = await self.execute_command(command, parse_json=True, coalesce=True)
+            items: List[Any] = result if isinstance(result, list) else []
+            for item in items:
+                yield item
+            return
+
+        full_command = (*self._argv_prefix, *command)
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Executing Ceph command: %s", " ".join(full_command))
+
+        proc = await asyncio.create_subprocess_exec(
+            *full_command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        # Both pipes exist since they were requested above
+        assert proc.stdout is not None and proc.stderr is not None
+        # Drain stderr alongside stdout so a chatty command cannot block
+        stderr_task = asyncio.ensure_future(proc.stderr.read())
+        try:
+            # The timeout covers the reads only, so it cannot expire at a yield
+            reader = _PrefixedReader(proc.stdout, self.timeout)
+            await reader.prime(_STREAM_CHUNK_SIZE)
+            if not _is_blank(reader.head):
+                async for item in ijson.items_async(reader, "item"):
+                    yield item
+            stderr_bytes = await reader.timed(stderr_task)
+            returncode = await reader.timed(proc.wait())
+        except TimeoutError as e:
+            logger.error("Command timed out after %s seconds", self.timeout)
             raise CephCommandFailedError(
                 command=" ".join(full_command),
                 exit_code=-1,
                 stderr=f"Command timed out after {self.timeout} seconds",
+                unavailable=True,
+            ) from e
+        except ijson.JSONError as e:
+            raise CephCommandFailedError(
+                command=" ".join(full_command),
+                exit_code=1,
+                stderr=f"Invalid JSON output: {e}",
             ) from e
+        finally:
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+            stderr_task.cancel()
+
+        if returncode != 0:
+            stderr = stderr_bytes.decode(errors="replace")
+            logger.error("Command failed with exit code %s: %s", returncode, stderr)
+            raise CephCommandFailedError(
+                command=" ".join(full_command),
+                exit_code=returncode,
+                stderr=stderr.strip(),
+            )
 
-    def pool_exists(self, pool_name: str) -> bool:
+    async def pool_exists(self, pool_name: str) -> bool:
         """Check if a pool exists.
 
         Args:
@@ -95,15 +408,27 @@ class CephClient:
             True if pool exists, False otherwise
         """
         try:
-            pools = self.execute_command(
-                ["osd", "pool", "ls", "--format", "json"],
-                parse_json=True,
-            )
-            return pool_name in pools
+            return pool_name in await ceph_read_cache.get("osd pool ls", self._load_pool_names)
         except CephCommandFailedError:
             return False
 
-    def crush_rule_exists(self, rule_name: str) -> bool:
+    async def list_pool_names(self) -> List[str]:
+        """List the names of all pools.
+
+        Returns:
+            Pool names
+
+        Raises:
+            CephCommandFailedError: If the pool list cannot be read
+        """
+        names: List[str] = await self.mon_command("osd pool ls")
+        return names
+
+    async def _load_pool_names(self) -> FrozenSet[str]:
+        """Load the set of pool names."""
+        return frozenset(await self.list_pool_names())
+
+    async def crush_rule_exists(self, rule_name: str) -> bool:
         """Check if a CRUSH rule exists.
 
         Args:
@@ -113,15 +438,17 @@ class CephClient:
             True if rule exists, False otherwise
         """
         try:
-            rules = self.execute_command(
-                ["osd", "crush", "rule", "ls"],
-                parse_json=False,
+            return rule_name in await ceph_read_cache.get(
+                "osd crush rule ls", self._load_rule_names
             )
-            return rule_name in rules.split("\n")
         except CephCommandFailedError:
             return False
 
-    def filesystem_exists(self, name: str) -> bool:
+    async def _load_rule_names(self) -> FrozenSet[str]:
+        """Load the set of CRUSH rule names."""
+        return frozenset(await self.mon_command("osd crush rule ls"))
+
+    async def filesystem_exists(self, name: str) -> bool:
         """Check if a filesystem exists.
 
         Args:
@@ -131,15 +458,15 @@ class CephClient:
             True if filesystem exists, False otherwise
         """
         try:
-            filesystems = self.execute_command(
-                ["fs", "ls", "--format", "json"],
-                parse_json=True,
-            )
-            return any(fs.get("name") == name for fs in filesystems)
+            return name in await ceph_read_cache.get("fs ls", self._load_filesystems)
         except CephCommandFailedError:
             return False
 
-    def create_pool(
+    async def _load_filesystems(self) -> Dict[str, Dict[str, Any]]:
+        """Load filesystems indexed by name, as cached under "fs ls"."""
+        return {fs["name"]: fs for fs in await self.list_filesystems()}
+
+    async def create_pool(
         self,
         pool_name: str,
         pg_num: int,
@@ -157,17 +484,18 @@ class CephClient:
         Raises:
             CephCommandFailedError: If pool creation fails
         """
-        self.execute_command([
-            "osd",
-            "pool",
-            "create",
-            pool_name,
-            str(pg_num),
-            pool_type,
-            crush_rule,
-        ])
-
-    def delete_pool(self, pool_name: str) -> None:
+        try:
+            await self.mon_command(
+                "osd pool create",
+                pool=pool_name,
+                pg_num=pg_num,
+                pool_type=pool_type,
+                rule=crush_rule,
+            )
+        finally:
+            ceph_read_cache.invalidate("osd pool ls", "df")
+
+    async def delete_pool(self, pool_name: str) -> None:
         """Delete a Ceph pool.
 
         Args:
@@ -176,16 +504,17 @@ class CephClient:
         Raises:
             CephCommandFailedError: If pool deletion fails
         """
-        self.execute_command([
-            "osd",
-            "pool",
-            "delete",
-            pool_name,
-            pool_name,
-            "--yes-i-really-really-mean-it",
-        ])
-
-    def create_filesystem(
+        try:
+            await self.mon_command(
+                "osd pool delete",
+                pool=pool_name,
+                pool2=pool_name,
+                yes_i_really_really_mean_it=True,
+            )
+        finally:
+            ceph_read_cache.invalidate("osd pool ls", "df")
+
+    async def create_filesystem(
         self,
         name: str,
         meta_pool: str,
@@ -201,15 +530,17 @@ class CephClient:
         Raises:
             CephCommandFailedError: If filesystem creation fails
         """
-        self.execute_command([
-            "fs",
-            "new",
-            name,
-            meta_pool,
-            data_pool,
-        ])
-
-    def set_filesystem_flag(
+        try:
+            await self.mon_command(
+                "fs new",
+                fs_name=name,
+                metadata=meta_pool,
+                data=data_pool,
+            )
+        finally:
+            ceph_read_cache.invalidate("fs ls")
+
+    async def set_filesystem_flag(
         self,
         name: str,
         flag: str,
@@ -225,15 +556,14 @@ class CephClient:
         Raises:
             CephCommandFailedError: If command fails
         """
-        self.execute_command([
-            "fs",
-            "set",
-            name,
-            flag,
-            "true" if value else "false",
-        ])
-
-    def authorize_filesystem_client(
+        await self.mon_command(
+            "fs set",
+            fs_name=name,
+            var=flag,
+            val="true" if value else "false",
+        )
+
+    async def authorize_filesystem_client(
         self,
         filesystem: str,
         client_name: str,
@@ -254,20 +584,19 @@ class CephClient:
         Raises:
             CephCommandFailedError: If authorization fails
         """
-        output = self.execute_command([
-            "fs",
-            "authorize",
-            filesystem,
-            f"client.{client_name}",
-            path,
-            permissions,
-        ])
-
-        # Parse the key from output
-        # Format: [client.name]\n\tkey = <key_value>
-        for line in str(output).split("\n"):
-            if "key" in line and "=" in line:
-                return line.split("=", 1)[1].strip()
+        output = await self.mon_command(
+            "fs authorize",
+            filesystem=filesystem,
+            entity=f"client.{client_name}",
+            caps=[path, permissions],
+        )
+
+        # Format: [{"entity": "client.name", "key": "<key_value>", "caps": {...}}]
+        entries = output if isinstance(output, list) else [output]
+        for entry in entries:
+            if isinstance(entry, dict) and entry.get("key"):
+                key: str = entry["key"]
+                return key
 
         raise CephCommandFailedError(
             command=f"fs authorize {filesystem}",
@@ -275,7 +604,7 @@ class CephClient:
             stderr="Failed to extract auth key from output",
         )
 
-    def delete_auth_client(self, client_name: str) -> None:
+    async def delete_auth_client(self, client_name: str) -> None:
         """Delete an authentication client.
 
         Args:
@@ -284,13 +613,15 @@ class CephClient:
         Raises:
             CephCommandFailedError: If deletion fails
         """
-        self.execute_command([
-            "auth",
-            "del",
-            f"client.{client_name}",
-        ], check=False)  # Don't fail if client doesn't exist
+        try:
+            await self.mon_command("auth del", entity=f"client.{client_name}")
+        except CephCommandFailedError as e:
+            # Don't fail if client doesn't exist; librados reports -ENOENT,
+            # the ceph CLI exits with ENOENT
+            if not (e.is_not_found or abs(e.details.get("exit_code", 0)) == errno.ENOENT):
+                raise
 
-    def get_filesystem_info(self, name: str) -> Dict[str, Any]:
+    async def get_filesystem_info(self, name: str) -> Dict[str, Any]:
         """Get filesystem information.
 
         Args:
@@ -305,17 +636,20 @@ class CephClient:
         """
         from app.core.exceptions import FilesystemNotFoundError
 
+        # 'fs volume' commands are served by the mgr, not the monitors, so
+        # they always go through the CLI
         try:
-            return self.execute_command(
+            return await self.execute_command(
                 ["fs", "volume", "info", name, "--format", "json"],
                 parse_json=True,
+                coalesce=True,
             )
         except CephCommandFailedError as e:
-            if "not found" in e.details.get("stderr", "").lower():
+            if e.is_not_found:
                 raise FilesystemNotFoundError(name) from e
             raise
 
-    def list_filesystems(self) -> List[Dict[str, Any]]:
+    async def list_filesystems(self) -> List[Dict[str, Any]]:
         """List all filesystems.
 
         Returns:
@@ -324,13 +658,10 @@ class CephClient:
         Raises:
             CephCommandFailedError: If command fails
         """
-        result = self.execute_command(
-            ["fs", "ls", "--format", "json"],
-            parse_json=True,
-        )
+        result = await self.mon_command("fs ls")
         return result if isinstance(result, list) else []
 
-    def get_cluster_df(self) -> Dict[str, Any]:
+    async def get_cluster_df(self) -> Dict[str, Any]:
         """Get cluster data usage statistics.
 
         Returns:
@@ -339,12 +670,10 @@ class CephClient:
         Raises:
             CephCommandFailedError: If command fails
         """
-        return self.execute_command(
-            ["df", "detail", "--format", "json"],
-            parse_json=True,
-        )
+        df: Dict[str, Any] = await self.mon_command("df", detail="detail")
+        return df
 
-    def remove_filesystem(self, name: str) -> None:
+    async def remove_filesystem(self, name: str) -> None:
         """Remove a filesystem.
 
         Args:
@@ -353,13 +682,17 @@ class CephClient:
         Raises:
             CephCommandFailedError: If removal fails
         """
-        self.execute_command([
-            "fs",
-            "volume",
-            "rm",
-            name,
-            "--yes-i-really-mean-it",
-        ])
+        # Served by the mgr volumes module, so this always uses the CLI
+        try:
+            await self.execute_command([
+                "fs",
+                "volume",
+                "rm",
+                name,
+                "--yes-i-really-mean-it",
+            ])
+        finally:
+            ceph_read_cache.invalidate("fs ls")
 
 
 # Global client instance
@@ -0,0 +1,93 @@
+"""Shared response cache backends.
+
+Routers keep a process-local cache of serialized responses. When several
+worker processes serve the API, a shared backend lets one refresh populate
+the cache for every worker instead of each worker querying Ceph on its own.
+"""
+
+import logging
+from functools import lru_cache
+from typing import Optional, Protocol, Tuple, Union
+
+from app.core.config import get_settings
+
+try:
+    from redis import asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(Protocol):
+    """Interface for a cache shared between worker processes."""
+
+    async def get(self, key: str) -> Optional[Tuple[bytes, float]]:
+        """Return the cached value and its remaining TTL in seconds, if any."""
+        ...
+
+    async def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        """Store a value that expires after ``ttl_seconds``."""
+        ...
+
+
+class RedisBackend:
+    """Cache backend storing serialized responses in Redis.
+
+    Redis errors are logged and treated as cache misses so an unavailable
+    cache never fails a request.
+    """
+
+    def __init__(self, url: str, prefix: str = "cephx-api:") -> None:
+        """Initialize the backend.
+
+        Args:
+            url: Redis connection URL
+            prefix: Prefix applied to every key
+        """
+        self.prefix = prefix
+        self.client = aioredis.from_url(url)
+
+    async def get(self, key: str) -> Optional[Tuple[bytes, float]]:
+        """Return the cached value and its remaining TTL in seconds, if any."""
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.get(self.prefix + key)
+                pipe.pttl(self.prefix + key)
+                value, pttl = await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Shared cache read failed: {e}")
+            return None
+
+        if value is None or pttl <= 0:
+            return None
+        return value, pttl / 1000
+
+    async def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        """Store a value that expires after ``ttl_seconds``."""
+        try:
+            await self.client.set(self.prefix + key, value, ex=ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Shared cache write failed: {e}")
+
+
+@lru_cache
+def get_shared_cache() -> Union[CacheBackend, None]:
+    """Get the configured shared cache backend.
+
+    Returns:
+        The shared backend, or None when only the process-local cache is used
+    """
+    settings = get_settings()
+    if settings.cache_backend != "redis":
+        return None
+
+    if not REDIS_AVAILABLE:
+        logger.warning(
+            "cache_backend is 'redis' but the redis package is not installed; "
+            "falling back to the process-local cache"
+        )
+        return None
+
+    return RedisBackend(settings.redis_url)
@@ -5,7 +5,13 @@ import asyncio
 import sys
 from typing import Any
 
-import requests
+import httpx
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 
 class CephAuthClient:
@@ -14,6 +20,9 @@ class CephAuthClient:
     def __init__(self, base_url: str, api_key: str) -> None:
         """Initialize client.
 
+        Requests share one connection pool and, with the ``h2`` package
+        installed, are multiplexed over a single HTTP/2 connection.
+
         Args:
             base_url: Base URL of the API (e.g., http://localhost:8000/api/v1)
             api_key: API key for authentication
@@ -23,8 +32,22 @@ class CephAuthClient:
             "X-API-Key": api_key,
             "Content-Type": "application/json",
         }
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=self.headers,
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_connections=8),
+            # Retry failed connection attempts
+            transport=httpx.AsyncHTTPTransport(http2=HTTP2_AVAILABLE, retries=3),
+        )
 
-    def create_auth(
+    async def __aenter__(self) -> "CephAuthClient":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.client.aclose()
+
+    async def create_auth(
         self,
         client_name: str,
         capabilities: dict[str, str],
@@ -39,11 +62,10 @@ class CephAuthClient:
             Created auth entity with key
 
         Raises:
-            requests.HTTPError: If request fails
+            httpx.HTTPStatusError: If request fails
         """
-        response = requests.post(
-            f"{self.base_url}/auth",
-            headers=self.headers,
+        response = await self.client.post(
+            "/auth",
             json={
                 "client_name": client_name,
                 "capabilities": capabilities,
@@ -52,7 +74,7 @@ class CephAuthClient:
         response.raise_for_status()
         return response.json()["data"]
 
-    def get_auth(self, client_name: str) -> dict[str, Any]:
+    async def get_auth(self, client_name: str) -> dict[str, Any]:
         """Get authentication details.
 
         Args:
@@ -62,16 +84,13 @@ class CephAuthClient:
             Auth entity details
 
         Raises:
-            requests.HTTPError: If request fails
+            httpx.HTTPStatusError: If request fails
         """
-        response = requests.get(
-            f"{self.base_url}/auth/{client_name}",
-            headers=self.headers,
-        )
+        response = await self.client.get(f"/auth/{client_name}")
         response.raise_for_status()
         return response.json()["data"]
 
-    def update_caps(
+    async def update_caps(
         self,
         client_name: str,
         capabilities: dict[str, str],
@@ -86,32 +105,28 @@ class CephAuthClient:
             Updated auth entity
 
         Raises:
-            requests.HTTPError: If request fails
+            httpx.HTTPStatusError: If request fails
         """
-        response = requests.put(
-            f"{self.base_url}/auth/{client_name}/caps",
-            headers=self.headers,
+        response = await self.client.put(
+            f"/auth/{client_name}/caps",
             json={"capabilities": capabilities},
         )
         response.raise_for_status()
         return response.json()["data"]
 
-    def delete_auth(self, client_name: str) -> None:
+    async def delete_auth(self, client_name: str) -> None:
         """Delete authentication entity.
 
         Args:
             client_name: Client name
 
         Raises:
-            requests.HTTPError: If request fails
+            httpx.HTTPStatusError: If request fails
         """
-        response = requests.delete(
-            f"{self.base_url}/auth/{client_name}",
-            headers=self.headers,
-        )
+        response = await self.client.delete(f"/auth/{client_name}")
         response.raise_for_status()
 
-    def list_auth(
+    async def list_auth(
         self,
         filter_prefix: str | None = None,
         limit: int = 100,
@@ -128,145 +143,148 @@ class CephAuthClient:
             List of auth entities with pagination info
 
         Raises:
-            requests.HTTPError: If request fails
+            httpx.HTTPStatusError: If request fails
         """
         params = {"limit": limit, "offset": offset}
         if filter_prefix:
             params["filter"] = filter_prefix
 
-        response = requests.get(
-            f"{self.base_url}/auth",
-            headers=self.headers,
-            params=params,
-        )
+        response = await self.client.get("/auth", params=params)
         response.raise_for_status()
         return response.json()["data"]
 
 
-def main() -> None:
+async def main() -> None:
     """Example usage of the CephX Authentication API."""
     # Initialize client
-    client = CephAuthClient(
+    async with CephAuthClient(
         base_url="http://localhost:8000/api/v1",
         api_key="admin-key",
-    )
-
-    print("=== CephX Authentication API Examples ===\n")
-
-    # Example 1: Create a new authentication
-    print("1. Creating new authentication for 'myapp'...")
-    try:
-        auth = client.create_auth(
-            client_name="myapp",
-            capabilities={
-                "mon": "allow r",
-                "osd": "allow rw pool=mypool",
-                "mds": "allow rw path=/data",
-            },
+    ) as client:
+        print("=== CephX Authentication API Examples ===\n")
+
+        # Example 1: Create a new authentication
+        print("1. Creating new authentication for 'myapp'...")
+        try:
+            auth = await client.create_auth(
+                client_name="myapp",
+                capabilities={
+                    "mon": "allow r",
+                    "osd": "allow rw pool=mypool",
+                    "mds": "allow rw path=/data",
+                },
+            )
+            print(f"   Created: {auth['entity']}")
+            print(f"   Key: {auth['key']}")
+            print(f"   Capabilities: {auth['caps']}\n")
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 409:
+                print("   Already exists, continuing...\n")
+            else:
+                print(f"   Error: {e}\n")
+                sys.exit(1)
+
+        # Examples 2, 4 and 5 only read, so they are sent together
+        details, all_clients, filtered = await asyncio.gather(
+            client.get_auth("myapp"),
+            client.list_auth(limit=10),
+            client.list_auth(filter_prefix="my", limit=10),
+            return_exceptions=True,
         )
-        print(f"   Created: {auth['entity']}")
-        print(f"   Key: {auth['key']}")
-        print(f"   Capabilities: {auth['caps']}\n")
-    except requests.HTTPError as e:
-        if e.response.status_code == 409:
-            print("   Already exists, continuing...\n")
+        for result in (details, all_clients, filtered):
+            if isinstance(result, Exception) and not isinstance(result, httpx.HTTPStatusError):
+                raise result
+
+        # Example 2: Get authentication details
+        print("2. Getting authentication details...")
+        if isinstance(details, httpx.HTTPStatusError):
+            print(f"   Error: {details}\n")
         else:
+            print(f"   Entity: {details['entity']}")
+            print(f"   Key: {details['key']}")
+            print(f"   Capabilities: {details['caps']}\n")
+
+        # Example 3: Update capabilities
+        print("3. Updating capabilities...")
+        try:
+            auth = await client.update_caps(
+                client_name="myapp",
+                capabilities={
+                    "mon": "allow r",
+                    "osd": "allow rw pool=production",
+                },
+            )
+            print(f"   Updated capabilities: {auth['caps']}\n")
+        except httpx.HTTPStatusError as e:
             print(f"   Error: {e}\n")
-            sys.exit(1)
-
-    # Example 2: Get authentication details
-    print("2. Getting authentication details...")
-    try:
-        auth = client.get_auth("myapp")
-        print(f"   Entity: {auth['entity']}")
-        print(f"   Key: {auth['key']}")
-        print(f"   Capabilities: {auth['caps']}\n")
-    except requests.HTTPError as e:
-        print(f"   Error: {e}\n")
-
-    # Example 3: Update capabilities
-    print("3. Updating capabilities...")
-    try:
-        auth = client.update_caps(
-            client_name="myapp",
-            capabilities={
-                "mon": "allow r",
-                "osd": "allow rw pool=production",
-            },
-        )
-        print(f"   Updated capabilities: {auth['caps']}\n")
-    except requests.HTTPError as e:
-        print(f"   Error: {e}\n")
-
-    # Example 4: List all authentications
-    print("4. Listing all client authentications...")
-    try:
-        result = client.list_auth(limit=10)
-        print(f"   Total clients: {result['total']}")
-        print(f"   Showing: {len(result['clients'])}")
-        for auth in result["clients"][:5]:  # Show first 5
-            print(f"   - {auth['entity']}")
-        print()
-    except requests.HTTPError as e:
-        print(f"   Error: {e}\n")
-
-    # Example 5: List with filter
-    print("5. Listing clients with prefix 'my'...")
-    try:
-        result = client.list_auth(filter_prefix="my", limit=10)
-        print(f"   Found: {result['total']} clients")
-        for auth in result["clients"]:
-            print(f"   - {auth['entity']}")
-        print()
-    except requests.HTTPError as e:
-        print(f"   Error: {e}\n")
-
-    # Example 6: Suspend a client (remove all capabilities)
-    print("6. Suspending client 'myapp' (removing capabilities)...")
-    try:
-        auth = client.update_caps(
-            client_name="myapp",
-            capabilities={},
-        )
-        print(f"   Suspended. Capabilities: {auth['caps']}\n")
-    except requests.HTTPError as e:
-        print(f"   Error: {e}\n")
-
-    # Example 7: Re-enable with new capabilities
-    print("7. Re-enabling client with new capabilities...")
-    try:
-        auth = client.update_caps(
-            client_name="myapp",
-            capabilities={
-                "mon": "allow r",
-                "osd": "allow rw pool=mypool",
-            },
-        )
-        print(f"   Re-enabled. Capabilities: {auth['caps']}\n")
-    except requests.HTTPError as e:
-        print(f"   Error: {e}\n")
-
-    # Example 8: Delete authentication
-    print("8. Deleting authentication 'myapp'...")
-    try:
-        client.delete_auth("myapp")
-        print("   Deleted successfully\n")
-    except requests.HTTPError as e:
-        print(f"   Error: {e}\n")
-
-    # Example 9: Verify deletion
-    print("9. Verifying deletion...")
-    try:
-        client.get_auth("myapp")
-        print("   ERROR: Still exists!\n")
-    except requests.HTTPError as e:
-        if e.response.status_code == 404:
-            print("   Confirmed: Authentication no longer exists\n")
+
+        # Example 4: List all authentications
+        print("4. Listing all client authentications...")
+        if isinstance(all_clients, httpx.HTTPStatusError):
+            print(f"   Error: {all_clients}\n")
         else:
-            print(f"   Unexpected error: {e}\n")
+            print(f"   Total clients: {all_clients['total']}")
+            print(f"   Showing: {len(all_clients['clients'])}")
+            for auth in all_clients["clients"][:5]:  # Show first 5
+                print(f"   - {auth['entity']}")
+            print()
+
+        # Example 5: List with filter
+        print("5. Listing clients with prefix 'my'...")
+        if isinstance(filtered, httpx.HTTPStatusError):
+            print(f"   Error: {filtered}\n")
+        else:
+            print(f"   Found: {filtered['total']} clients")
+            for auth in filtered["clients"]:
+                print(f"   - {auth['entity']}")
+            print()
+
+        # Example 6: Suspend a client (remove all capabilities)
+        print("6. Suspending client 'myapp' (removing capabilities)...")
+        try:
+            auth = await client.update_caps(
+                client_name="myapp",
+                capabilities={},
+            )
+            print(f"   Suspended. Capabilities: {auth['caps']}\n")
+        except httpx.HTTPStatusError as e:
+            print(f"   Error: {e}\n")
+
+        # Example 7: Re-enable with new capabilities
+        print("7. Re-enabling client with new capabilities...")
+        try:
+            auth = await client.update_caps(
+                client_name="myapp",
+                capabilities={
+                    "mon": "allow r",
+                    "osd": "allow rw pool=mypool",
+                },
+            )
+            print(f"   Re-enabled. Capabilities: {auth['caps']}\n")
+        except httpx.HTTPStatusError as e:
+            print(f"   Error: {e}\n")
+
+        # Example 8: Delete authentication
+        print("8. Deleting authentication 'myapp'...")
+        try:
+            await client.delete_auth("myapp")
+            print("   Deleted successfully\n")
+        except httpx.HTTPStatusError as e:
+            print(f"   Error: {e}\n")
+
+        # Example 9: Verify deletion
+        print("9. Verifying deletion...")
+        try:
+            await client.get_auth("myapp")
+            print("   ERROR: Still exists!\n")
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                print("   Confirmed: Authentication no longer exists\n")
+            else:
+                print(f"   Unexpected error: {e}\n")
 
-    print("=== Examples completed ===")
+        print("=== Examples completed ===")
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
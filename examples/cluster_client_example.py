@@ -1,10 +1,17 @@
 #!/usr/bin/env python3
 """Example client for Ceph cluster API endpoints."""
 
+import asyncio
 import sys
 from typing import Any
 
-import requests
+import httpx
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 
 class CephClusterAPIClient:
@@ -13,14 +20,31 @@ class CephClusterAPIClient:
     def __init__(self, base_url: str, api_key: str) -> None:
         """Initialize client.
 
+        Requests share one connection pool and, with the ``h2`` package
+        installed, are multiplexed over a single HTTP/2 connection.
+
         Args:
             base_url: Base URL of the API (e.g., http://localhost:8080)
             api_key: API key for authentication
         """
         self.base_url = base_url.rstrip("/")
         self.headers = {"X-API-Key": api_key}
-
-    def _make_request(self, endpoint: str) -> dict[str, Any]:
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=self.headers,
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_connections=8),
+            # Retry failed connection attempts
+            transport=httpx.AsyncHTTPTransport(http2=HTTP2_AVAILABLE, retries=3),
+        )
+
+    async def __aenter__(self) -> "CephClusterAPIClient":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.client.aclose()
+
+    async def _make_request(self, endpoint: str) -> dict[str, Any]:
         """Make API request and handle errors.
 
         Args:
@@ -32,43 +56,45 @@ class CephClusterAPIClient:
         Raises:
             SystemExit: If request fails
         """
-        url = f"{self.base_url}{endpoint}"
         try:
-            response = requests.get(url, headers=self.headers)
+            response = await self.client.get(endpoint)
             response.raise_for_status()
             return response.json()
-        except requests.exceptions.HTTPError as e:
+        except httpx.HTTPStatusError as e:
             print(f"HTTP Error: {e}", file=sys.stderr)
-            if response.text:
-                print(f"Response: {response.text}", file=sys.stderr)
+            if e.response.text:
+                print(f"Response: {e.response.text}", file=sys.stderr)
             sys.exit(1)
-        except requests.exceptions.RequestException as e:
+        except httpx.RequestError as e:
             print(f"Request Error: {e}", file=sys.stderr)
             sys.exit(1)
 
-    def get_monitors(self) -> dict[str, Any]:
+    async def get_monitors(self) -> dict[str, Any]:
         """Get cluster monitor information.
 
         Returns:
             Monitor data including list of monitors and total count
         """
-        return self._make_request("/api/v1/cluster/monitors")
+        return await self._make_request("/api/v1/cluster/monitors")
 
-    def get_status(self) -> dict[str, Any]:
+    async def get_status(self) -> dict[str, Any]:
         """Get cluster status.
 
         Returns:
             Cluster status including health, monitor, OSD, and PG status
         """
-        return self._make_request("/api/v1/cluster/status")
+        return await self._make_request("/api/v1/cluster/status")
 
-    def get_df(self) -> dict[str, Any]:
+    async def get_df(self) -> dict[str, Any]:
         """Get cluster disk usage statistics.
 
         Returns:
             Cluster df data including global stats and per-pool statistics
         """
-        return self._make_request("/api/v1/cluster/df")
+        return await self._make_request("/api/v1/cluster/df")
+
+
+_BYTE_UNITS = ("B", "KB", "MB", "GB", "TB", "PB", "EB")
 
 
 def format_bytes(bytes_value: int) -> str:
@@ -80,20 +106,25 @@ def format_bytes(bytes_value: int) -> str:
     Returns:
         Formatted string (e.g., "1.5 TB")
     """
-    for unit in ["B", "KB", "MB", "GB", "TB", "PB"]:
-        if bytes_value < 1024.0:
-            return f"{bytes_value:.2f} {unit}"
-        bytes_value /= 1024.0
-    return f"{bytes_value:.2f} EB"
+    if bytes_value < 1024:
+        return f"{bytes_value:.2f} B"
+    # Each unit is 2**10 times the previous one, so the bit length picks it
+    index = min((int(bytes_value).bit_length() - 1) // 10, len(_BYTE_UNITS) - 1)
+    return f"{bytes_value / (1 << (index * 10)):.2f} {_BYTE_UNITS[index]}"
 
 
-def main() -> None:
+async def main() -> None:
     """Main function demonstrating API usage."""
-    # Initialize client
-    client = CephClusterAPIClient(
+    # Initialize client and fetch everything concurrently
+    async with CephClusterAPIClient(
         base_url="http://localhost:8080",
         api_key="admin-key",
-    )
+    ) as client:
+        monitors_response, status_response, df_response = await asyncio.gather(
+            client.get_monitors(),
+            client.get_status(),
+            client.get_df(),
+        )
 
     print("=" * 80)
     print("Ceph Cluster Information")
@@ -103,7 +134,6 @@ def main() -> None:
     # Get and display monitor information
     print("Monitor Information:")
     print("-" * 80)
-    monitors_response = client.get_monitors()
     if monitors_response["status"] == "success":
         monitors_data = monitors_response["data"]
         print(f"Total Monitors: {monitors_data['total']}")
@@ -117,7 +147,6 @@ def main() -> None:
     # Get and display cluster status
     print("Cluster Status:")
     print("-" * 80)
-    status_response = client.get_status()
     if status_response["status"] == "success":
         status_data = status_response["data"]
 
@@ -162,7 +191,6 @@ def main() -> None:
     # Get and display cluster disk usage
     print("Cluster Disk Usage:")
     print("-" * 80)
-    df_response = client.get_df()
     if df_response["status"] == "success":
         df_data = df_response["data"]
 
@@ -199,7 +227,7 @@ def main() -> None:
 
 if __name__ == "__main__":
     try:
-        main()
+        asyncio.run(main())
     except KeyboardInterrupt:
         print("\nInterrupted by user", file=sys.stderr)
         sys.exit(130)
@@ -0,0 +1,142 @@
+"""Shared pytest fixtures.
+
+The suite runs under pytest-xdist with one worker per test file. Fixtures
+must not write to shared files; module state (caches, the ceph_client
+singleton) is per worker process and may only be patched for one test.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional
+from unittest.mock import MagicMock, create_autospec
+
+import httpx
+import orjson
+import pytest
+import pytest_asyncio
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.ceph_client import CephClient
+
+# Modules that bind the shared ceph_client at import time
+CEPH_CLIENT_MODULES = (
+    "app.services.ceph_client",
+    "app.routers.cluster",
+    "app.routers.filesystem",
+    "app.routers.osd",
+    "app.routers.snapshot",
+)
+
+
+class StubCeph:
+    """Minimal stand-in for ceph_client returning canned values.
+
+    Cheaper than AsyncMock for tests that only need return values. Set
+    ``returns[method]`` to the value to return, a callable computing it from
+    the call arguments, or an exception to raise.
+    """
+
+    def __init__(self) -> None:
+        self.returns: Dict[str, Any] = {}
+
+    def __getattr__(self, name: str) -> Callable[..., Awaitable[Any]]:
+        try:
+            value = self.returns[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+        async def method(*args: Any, **kwargs: Any) -> Any:
+            if isinstance(value, BaseException):
+                raise value
+            return value(*args, **kwargs) if callable(value) else value
+
+        return method
+
+
+def jbody(response: httpx.Response) -> Any:
+    """Decode a test response body with orjson."""
+    return orjson.loads(response.content)
+
+
+def asgi_get(path: str, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+    """GET ``path`` by calling the ASGI app directly.
+
+    Skips TestClient's thread bridge; suited to requests that touch no
+    mocked state.
+    """
+    async def call() -> httpx.Response:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as ac:
+            return await ac.get(path, headers=headers)
+
+    return asyncio.run(call())
+
+
+def _install_ceph_client(monkeypatch: pytest.MonkeyPatch, replacement: Any) -> None:
+    """Patch ceph_client in every module that imported it by name."""
+    for module in CEPH_CLIENT_MODULES:
+        monkeypatch.setattr(f"{module}.ceph_client", replacement)
+
+
+@pytest.fixture(scope="session")
+def client() -> Iterator[TestClient]:
+    """One test client for the whole session.
+
+    The app's lifespan is deliberately not entered: it would connect to Ceph
+    and start the background cache refresh, which tests mock per request.
+    """
+    yield TestClient(app)
+
+
+@pytest.fixture(scope="session")
+def admin_client() -> Iterator[TestClient]:
+    """Test client sending the admin API key with every request."""
+    yield TestClient(app, headers={"X-API-Key": "admin-key"})
+
+
+@pytest.fixture(scope="session")
+def readonly_client() -> Iterator[TestClient]:
+    """Test client sending the read-only API key with every request."""
+    yield TestClient(app, headers={"X-API-Key": "readonly-key"})
+
+
+@pytest_asyncio.fixture
+async def aclient() -> AsyncIterator[httpx.AsyncClient]:
+    """Async client calling the ASGI app directly with the admin API key.
+
+    Avoids TestClient's portal thread. ASGITransport holds no connections,
+    so a client per test costs no more than a shared one and keeps each
+    test on its own event loop.
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://testserver", headers={"X-API-Key": "admin-key"}
+    ) as ac:
+        yield ac
+
+
+@pytest.fixture(scope="session")
+def _ceph_spec() -> MagicMock:
+    """Autospec of CephClient, built once per session; async methods are AsyncMocks."""
+    return create_autospec(CephClient, instance=True)
+
+
+@pytest.fixture
+def mock_ceph(monkeypatch: pytest.MonkeyPatch, _ceph_spec: MagicMock) -> MagicMock:
+    """Replace the shared ceph_client with the session autospec for one test.
+
+    The autospec is reset first, so return values and side effects never
+    carry over between tests. Every module that imported the client by name
+    is patched, so routers see the mock as well.
+    """
+    _ceph_spec.reset_mock(return_value=True, side_effect=True)
+    _install_ceph_client(monkeypatch, _ceph_spec)
+    return _ceph_spec
+
+
+@pytest.fixture
+def stub_ceph(monkeypatch: pytest.MonkeyPatch) -> StubCeph:
+    """Replace the shared ceph_client with a StubCeph for one test."""
+    stub = StubCeph()
+    _install_ceph_client(monkeypatch, stub)
+    return stub
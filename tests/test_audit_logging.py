@@ -0,0 +1,59 @@
+"""Tests for audit logging."""
+
+import asyncio
+import json
+from unittest.mock import MagicMock, patch
+
+from app.core.logging import AuditLogger
+
+
+class TestAuditLogger:
+    """Tests for AuditLogger."""
+
+    def _make_logger(self) -> AuditLogger:
+        audit = AuditLogger.__new__(AuditLogger)
+        audit.settings = MagicMock(audit_log_enabled=True)
+        audit.logger = MagicMock()
+        audit._queue = None
+        audit._drain_task = None
+        return audit
+
+    def test_writes_synchronously_when_not_started(self) -> None:
+        """Test that entries are written immediately without a drain task."""
+        audit = self._make_logger()
+
+        audit.log_operation("READ", "cluster:df", "admin", "SUCCESS")
+
+        audit.logger.info.assert_called_once()
+        entry = json.loads(audit.logger.info.call_args[0][0])
+        assert entry["resource"] == "cluster:df"
+
+    def test_queued_entries_flushed_on_stop(self) -> None:
+        """Test that queued entries are written by the drain task, one record each."""
+        audit = self._make_logger()
+
+        async def run() -> None:
+            audit.start()
+            for i in range(3):
+                audit.log_operation("READ", f"fs:{i}", "admin", "SUCCESS")
+            # Nothing is written on the request path
+            audit.logger.info.assert_not_called()
+            await audit.stop()
+
+        asyncio.run(run())
+
+        # One log record per entry
+        records = [call[0][0] for call in audit.logger.info.call_args_list]
+        assert [json.loads(record)["resource"] for record in records] == ["fs:0", "fs:1", "fs:2"]
+
+    def test_disabled_logger_writes_nothing(self) -> None:
+        """Test that nothing is logged when audit logging is disabled."""
+        audit = self._make_logger()
+        audit.settings.audit_log_enabled = False
+
+        with patch("asyncio.create_task") as mock_create_task:
+            audit.start()
+        audit.log_operation("READ", "cluster:df", "admin", "SUCCESS")
+
+        mock_create_task.assert_not_called()
+        audit.logger.info.assert_not_called()
@@ -9,6 +9,16 @@ from fastapi.testclient import TestClient
 from app.ceph.errors import CephAuthNotFound, CephCommandError
 from app.models.auth import APIResponse, CreateAuthRequest, UpdateCapsRequest
 
+# 150 test clients for pagination; a tuple so tests cannot grow or shrink it
+MOCK_AUTH_DUMP_150 = tuple(
+    {
+        "entity": f"client.testuser{i}",
+        "key": f"key{i}",
+        "caps": {"mon": "allow r"},
+    }
+    for i in range(150)
+)
+
 
 @pytest.fixture
 def mock_ceph_client():
@@ -221,17 +231,7 @@ class TestListAuth:
 
     def test_list_auth_pagination(self, mock_ceph_client):
         """Test pagination of auth list."""
-        # Generate 150 test clients
-        auth_dump = [
-            {
-                "entity": f"client.testuser{i}",
-                "key": f"key{i}",
-                "caps": {"mon": "allow r"},
-            }
-            for i in range(150)
-        ]
-
-        mock_ceph_client.execute.return_value = {"auth_dump": auth_dump}
+        mock_ceph_client.execute.return_value = {"auth_dump": MOCK_AUTH_DUMP_150}
 
         # With limit=100, offset=0: should return first 100
         # With limit=100, offset=100: should return next 50
@@ -252,31 +252,34 @@ class TestListAuth:
 class TestAuthModels:
     """Tests for auth models."""
 
-    def test_client_name_validation(self):
-        """Test client name validation."""
-        # Valid names
-        valid_names = ["testuser", "test_user", "test-user", "test123", "TEST"]
-        for name in valid_names:
-            request = CreateAuthRequest(
-                client_name=name,
-                capabilities={"mon": "allow r"},
-            )
-            assert request.client_name == name
+    @pytest.mark.parametrize(
+        "name", ["testuser", "test_user", "test-user", "test123", "TEST"]
+    )
+    def test_client_name_valid(self, name):
+        """Test that valid client names are accepted."""
+        request = CreateAuthRequest(
+            client_name=name,
+            capabilities={"mon": "allow r"},
+        )
+        assert request.client_name == name
 
-        # Invalid names
-        invalid_names = [
+    @pytest.mark.parametrize(
+        "name",
+        [
             "test@user",  # special chars
             "test user",  # space
             "test.user",  # dot
             "",  # empty
             "a" * 65,  # too long
-        ]
-        for name in invalid_names:
-            with pytest.raises(ValueError):
-                CreateAuthRequest(
-                    client_name=name,
-                    capabilities={"mon": "allow r"},
-                )
+        ],
+    )
+    def test_client_name_invalid(self, name):
+        """Test that invalid client names are rejected."""
+        with pytest.raises(ValueError):
+            CreateAuthRequest(
+                client_name=name,
+                capabilities={"mon": "allow r"},
+            )
 
     def test_client_name_strips_prefix(self):
         """Test that client. prefix is stripped."""
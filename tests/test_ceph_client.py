@@ -0,0 +1,313 @@
+"""Tests for the Ceph command client."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import orjson
+import pytest
+
+from app.core.exceptions import CephCommandFailedError
+from app.services.ceph_cache import ceph_read_cache
+from app.services.ceph_client import CephClient, _PrefixedReader
+
+
+@pytest.fixture(autouse=True)
+def _clear_read_cache() -> None:
+    """Clear the Ceph read cache so each test sees its own mocked listings."""
+    ceph_read_cache.clear()
+
+
+class TestExecuteCommand:
+    """Tests for CephClient.execute_command."""
+
+    def _fake_process(self, stdout: bytes, returncode: int = 0) -> MagicMock:
+        proc = MagicMock(returncode=returncode)
+        proc.communicate = AsyncMock(return_value=(stdout, b"boom"))
+        proc.wait = AsyncMock()
+        return proc
+
+    def test_parses_json_output(self) -> None:
+        """Test that JSON output is parsed from the ceph process."""
+        client = CephClient()
+        proc = self._fake_process(b'{"epoch": 3}\n')
+
+        with patch("asyncio.create_subprocess_exec", AsyncMock(return_value=proc)) as mock_exec:
+            result = asyncio.run(client.execute_command(["mon", "stat"], parse_json=True))
+
+        assert result == {"epoch": 3}
+        argv = mock_exec.call_args[0]
+        assert argv[0] == "ceph"
+        assert argv[argv.index("--id") + 1] == client.settings.ceph_user
+        assert argv[-2:] == ("mon", "stat")
+
+    def test_nonzero_exit_raises(self) -> None:
+        """Test that a failing command raises CephCommandFailedError."""
+        client = CephClient()
+        proc = self._fake_process(b"", returncode=2)
+
+        with patch("asyncio.create_subprocess_exec", AsyncMock(return_value=proc)):
+            with pytest.raises(CephCommandFailedError) as exc_info:
+                asyncio.run(client.execute_command(["fs", "ls"]))
+
+        assert exc_info.value.details["exit_code"] == 2
+        assert exc_info.value.details["stderr"] == "boom"
+        assert not exc_info.value.is_not_found
+
+    def test_missing_entity_is_classified(self) -> None:
+        """Test that ENOENT-style stderr marks the error as not found."""
+        error = CephCommandFailedError("ceph fs volume info x", 2, "Error ENOENT: x Does Not Exist")
+
+        assert error.is_not_found
+
+    def test_timeout_kills_process(self) -> None:
+        """Test that a timed out command is killed and reported unavailable."""
+        client = CephClient()
+        client.timeout = 0.01
+        proc = self._fake_process(b"")
+
+        async def hang() -> None:
+            await asyncio.sleep(1)
+
+        proc.communicate = hang
+
+        with patch("asyncio.create_subprocess_exec", AsyncMock(return_value=proc)):
+            with pytest.raises(CephCommandFailedError) as exc_info:
+                asyncio.run(client.execute_command(["status"]))
+
+        proc.kill.assert_called_once()
+        assert exc_info.value.is_unavailable
+
+    def test_coalesced_calls_share_one_process(self) -> None:
+        """Test that concurrent coalesced reads run the command once."""
+        client = CephClient()
+        proc = self._fake_process(b'[{"path": "/"}]')
+
+        async def run() -> list:
+            return await asyncio.gather(
+                *(client.execute_command(["fs", "ls"], parse_json=True, coalesce=True)
+                  for _ in range(3))
+            )
+
+        with patch("asyncio.create_subprocess_exec", AsyncMock(return_value=proc)) as mock_exec:
+            assert asyncio.run(run()) == [[{"path": "/"}]] * 3
+            asyncio.run(client.execute_command(["fs", "ls"], parse_json=True, coalesce=True))
+
+        assert mock_exec.call_count == 2
+        assert client._inflight == {}
+
+    def test_stream_yields_array_items(self) -> None:
+        """Test that streamed commands yield the items of a JSON array."""
+        client = CephClient()
+
+        async def collect(output: object) -> list:
+            with patch.object(client, "execute_command", return_value=output):
+                return [item async for item in client.execute_command_stream(["x"])]
+
+        with patch("app.services.ceph_client.IJSON_AVAILABLE", False):
+            assert asyncio.run(collect([{"path": "/"}, {"path": "/a"}])) == [
+                {"path": "/"},
+                {"path": "/a"},
+            ]
+            assert asyncio.run(collect({})) == []
+
+    def test_stream_timeout_excludes_consumer_time(self) -> None:
+        """Test that only waits on the process count against the stream timeout."""
+
+        async def run() -> None:
+            stream = asyncio.StreamReader()
+            stream.feed_data(b"[1, 2]")
+            reader = _PrefixedReader(stream, timeout=0.05)
+            await reader.prime(2)
+            assert await reader.read() == b"[1"
+            await asyncio.sleep(0.1)
+            assert await reader.read(16) == b", 2]"
+            with pytest.raises(TimeoutError):
+                await reader.read(16)
+
+        asyncio.run(run())
+
+
+class TestMonCommand:
+    """Tests for CephClient.mon_command."""
+
+    def test_falls_back_to_cli_without_connection(self) -> None:
+        """Test that monitor commands use the ceph CLI when not connected."""
+        client = CephClient()
+
+        with patch.object(
+            client, "execute_command", return_value={"epoch": 1}
+        ) as mock_exec:
+            result = asyncio.run(client.mon_command("df", detail="detail"))
+
+        assert result == {"epoch": 1}
+        mock_exec.assert_called_once_with(
+            ["df", "detail", "--format", "json"],
+            parse_json=True,
+        )
+
+    def test_cli_fallback_expands_flags_and_lists(self) -> None:
+        """Test that boolean and list arguments map to CLI flags and values."""
+        client = CephClient()
+
+        with patch.object(
+            client,
+            "execute_command",
+            return_value=[{"entity": "client.app", "key": "AQB=="}],
+        ) as mock_exec:
+            key = asyncio.run(client.authorize_filesystem_client("fs1", "app", "/", "rw"))
+            asyncio.run(client.delete_pool("cephfs.fs1.data"))
+
+        assert key == "AQB=="
+        assert mock_exec.call_args_list[0][0][0] == [
+            "fs", "authorize", "fs1", "client.app", "/", "rw", "--format", "json",
+        ]
+        assert mock_exec.call_args_list[1][0][0] == [
+            "osd", "pool", "delete", "cephfs.fs1.data", "cephfs.fs1.data",
+            "--yes-i-really-really-mean-it", "--format", "json",
+        ]
+
+    def test_uses_pooled_connection(self) -> None:
+        """Test that a pooled connection is borrowed and returned."""
+        client = CephClient()
+        cluster = MagicMock()
+        cluster.mon_command.return_value = (0, orjson.dumps({"epoch": 7}), "")
+        client._pool = asyncio.Queue()
+        client._pool.put_nowait(cluster)
+
+        with patch.object(client, "execute_command") as mock_exec:
+            result = asyncio.run(client.mon_command("mon stat"))
+
+        assert result == {"epoch": 7}
+        mock_exec.assert_not_called()
+        assert client._pool.get_nowait() is cluster
+
+    def test_concurrent_commands_wait_for_free_connection(self) -> None:
+        """Test that commands beyond the pool size wait for a connection."""
+        client = CephClient()
+        cluster = MagicMock()
+        cluster.mon_command.return_value = (0, b"{}", "")
+        client._pool = asyncio.Queue()
+        client._pool.put_nowait(cluster)
+
+        async def run() -> list:
+            return await asyncio.gather(*(client.mon_command("mon stat") for _ in range(3)))
+
+        assert asyncio.run(run()) == [{}, {}, {}]
+        assert cluster.mon_command.call_count == 3
+        assert client._pool.qsize() == 1
+
+    def test_failed_connection_is_shut_down(self) -> None:
+        """Test that a handle whose connect() fails is shut down, not leaked."""
+        client = CephClient()
+        fake_rados = MagicMock(Error=type("Error", (Exception,), {}))
+        connected, failed = MagicMock(), MagicMock()
+        failed.connect.side_effect = fake_rados.Error("timed out")
+        fake_rados.Rados.side_effect = [connected, failed]
+
+        with patch("app.services.ceph_client.RADOS_AVAILABLE", True), patch(
+            "app.services.ceph_client.rados", fake_rados, create=True
+        ):
+            client.connect()
+
+        failed.shutdown.assert_called_once()
+        connected.shutdown.assert_not_called()
+        assert client._pool.qsize() == 1
+
+    def test_shutdown_closes_pooled_connections(self) -> None:
+        """Test that shutdown closes every pooled connection."""
+        client = CephClient()
+        clusters = [MagicMock(), MagicMock()]
+        client._pool = asyncio.Queue()
+        for cluster in clusters:
+            client._pool.put_nowait(cluster)
+
+        client.shutdown()
+
+        for cluster in clusters:
+            cluster.shutdown.assert_called_once()
+
+        async def borrow() -> object:
+            async with client.session() as session:
+                return session
+
+        assert asyncio.run(borrow()) is None
+
+
+class TestDeleteAuthClient:
+    """Tests for CephClient.delete_auth_client."""
+
+    def test_missing_client_is_ignored(self) -> None:
+        """Test that deleting a client that does not exist succeeds."""
+        client = CephClient()
+        error = CephCommandFailedError("auth del", 2, "Error ENOENT: failed to find client.app")
+
+        with patch.object(client, "mon_command", side_effect=error):
+            asyncio.run(client.delete_auth_client("app"))
+
+    def test_other_failures_are_raised(self) -> None:
+        """Test that failures other than a missing client propagate."""
+        client = CephClient()
+        error = CephCommandFailedError("auth del", 13, "Error EACCES: access denied")
+
+        with patch.object(client, "mon_command", side_effect=error):
+            with pytest.raises(CephCommandFailedError):
+                asyncio.run(client.delete_auth_client("app"))
+
+
+class TestExistenceChecks:
+    """Tests for the cached *_exists checks."""
+
+    def test_filesystem_exists_reuses_listing(self) -> None:
+        """Test that repeated checks share one 'fs ls' call."""
+        client = CephClient()
+
+        async def run() -> list:
+            return [
+                await client.filesystem_exists("cephfs"),
+                await client.filesystem_exists("missing"),
+            ]
+
+        with patch.object(
+            client, "execute_command", return_value=[{"name": "cephfs"}]
+        ) as mock_exec:
+            assert asyncio.run(run()) == [True, False]
+
+        mock_exec.assert_called_once()
+
+    def test_create_filesystem_invalidates_listing(self) -> None:
+        """Test that creating a filesystem drops the cached names."""
+        client = CephClient()
+        listings = [[], [{"name": "newfs"}]]
+
+        async def execute(command: list, **kwargs: object) -> object:
+            if command[:2] == ["fs", "ls"]:
+                return listings.pop(0)
+            return ""
+
+        async def run() -> list:
+            before = await client.filesystem_exists("newfs")
+            await client.create_filesystem("newfs", "meta", "data")
+            return [before, await client.filesystem_exists("newfs")]
+
+        with patch.object(client, "execute_command", side_effect=execute):
+            assert asyncio.run(run()) == [False, True]
+
+    def test_crush_rule_exists_uses_json_listing(self) -> None:
+        """Test that CRUSH rule checks share one JSON 'osd crush rule ls' call."""
+        client = CephClient()
+
+        async def run() -> list:
+            return [
+                await client.crush_rule_exists("replicated_rule"),
+                await client.crush_rule_exists("replicated"),
+            ]
+
+        with patch.object(
+            client, "execute_command", return_value=["replicated_rule", "ec_rule"]
+        ) as mock_exec:
+            assert asyncio.run(run()) == [True, False]
+
+        mock_exec.assert_called_once_with(
+            ["osd", "crush", "rule", "ls", "--format", "json"],
+            parse_json=True,
+        )
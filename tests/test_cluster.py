@@ -1,15 +1,23 @@
 """Tests for cluster endpoints."""
 
+import asyncio
 import json
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
 
+import orjson
 import pytest
+from fastapi.responses import Response
 from fastapi.testclient import TestClient
 
-from app.routers.cluster import _cache
-from main import app
+from app.core.auth import AuthContext
+from app.core.exceptions import CephCommandFailedError
+from app.routers import cluster
+from app.routers.cluster import _cache, _fingerprint_cache, _locks, ttl_cache
+from tests.conftest import StubCeph, jbody
 
-client = TestClient(app)
+
+# Route handlers called directly, bypassing the HTTP layer, run as this user
+ADMIN_AUTH = AuthContext(user="admin", permissions=["*"])
 
 # Mock response for `ceph mon dump --format json` (top-level mons list)
 MOCK_MON_DUMP = {
@@ -82,23 +90,21 @@ MOCK_CEPH_DF = {
 def _clear_route_cache() -> None:
     """Clear the TTL cache before each test to prevent cross-test pollution."""
     _cache.clear()
+    _fingerprint_cache.clear()
+    _locks.clear()
 
 
 class TestMonitorsEndpoint:
     """Tests for /monitors endpoint."""
 
-    @patch("app.services.ceph_client.ceph_client.execute_command")
-    def test_get_monitors_success(self, mock_execute: MagicMock) -> None:
+    def test_get_monitors_success(self, mock_ceph: MagicMock) -> None:
         """Test successful retrieval of monitors."""
-        mock_execute.return_value = MOCK_MON_DUMP
+        mock_ceph.mon_command.return_value = MOCK_MON_DUMP
 
-        response = client.get(
-            "/api/v1/cluster/monitors",
-            headers={"X-API-Key": "admin-key"},
-        )
+        response = asyncio.run(cluster.get_monitors(request=None, auth=ADMIN_AUTH))
 
         assert response.status_code == 200
-        data = response.json()
+        data = orjson.loads(response.body)
         assert data["status"] == "success"
         assert "data" in data
         assert data["data"]["total"] == 3
@@ -110,24 +116,33 @@ class TestMonitorsEndpoint:
         assert mon["addr"] == "10.10.1.1:6789"
         assert mon["rank"] == 0
 
-    def test_get_monitors_no_api_key(self) -> None:
-        """Test monitors endpoint without API key."""
-        response = client.get("/api/v1/cluster/monitors")
+    def test_get_monitors_unchanged_epoch_skips_dump(
+        self, admin_client: TestClient, mock_ceph: MagicMock
+    ) -> None:
+        """Test that the monmap is only re-fetched when its epoch changes."""
+        mock_ceph.mon_command.side_effect = lambda prefix, **kwargs: (
+            {"epoch": 5} if prefix == "mon stat" else MOCK_MON_DUMP
+        )
 
-        assert response.status_code == 401
-        data = response.json()
-        assert data["status"] == "error"
-        assert data["code"] == "INVALID_API_KEY"
+        for _ in range(2):
+            _cache.clear()
+            response = admin_client.get("/api/v1/cluster/monitors")
+            assert jbody(response)["data"]["total"] == 3
 
-    def test_get_monitors_invalid_api_key(self) -> None:
-        """Test monitors endpoint with invalid API key."""
-        response = client.get(
-            "/api/v1/cluster/monitors",
-            headers={"X-API-Key": "invalid-key"},
-        )
+        prefixes = [call.args[0] for call in mock_ceph.mon_command.call_args_list]
+        assert prefixes == ["mon stat", "mon dump", "mon stat"]
+
+    @pytest.mark.parametrize(
+        "headers",
+        [None, {"X-API-Key": "invalid-key"}],
+        ids=["no_api_key", "invalid_api_key"],
+    )
+    def test_get_monitors_auth_failure(self, client: TestClient, headers: dict) -> None:
+        """Test monitors endpoint without a valid API key."""
+        response = client.get("/api/v1/cluster/monitors", headers=headers)
 
         assert response.status_code == 401
-        data = response.json()
+        data = jbody(response)
         assert data["status"] == "error"
         assert data["code"] == "INVALID_API_KEY"
 
@@ -135,18 +150,14 @@ class TestMonitorsEndpoint:
 class TestClusterStatusEndpoint:
     """Tests for /status endpoint."""
 
-    @patch("app.services.ceph_client.ceph_client.execute_command")
-    def test_get_status_success(self, mock_execute: MagicMock) -> None:
+    def test_get_status_success(self, admin_client: TestClient, stub_ceph: StubCeph) -> None:
         """Test successful retrieval of cluster status."""
-        mock_execute.return_value = MOCK_CEPH_STATUS
+        stub_ceph.returns["mon_command"] = MOCK_CEPH_STATUS
 
-        response = client.get(
-            "/api/v1/cluster/status",
-            headers={"X-API-Key": "admin-key"},
-        )
+        response = admin_client.get("/api/v1/cluster/status")
 
         assert response.status_code == 200
-        data = response.json()
+        data = jbody(response)
         assert data["status"] == "success"
         assert "data" in data
 
@@ -170,36 +181,47 @@ class TestClusterStatusEndpoint:
         assert pg_status["num_pgs"] == 1024
         assert pg_status["num_active_clean"] == 1024
 
-    @patch("app.services.ceph_client.ceph_client.execute_command")
-    def test_get_status_readonly_permission(self, mock_execute: MagicMock) -> None:
+    def test_get_status_readonly_permission(
+        self, readonly_client: TestClient, stub_ceph: StubCeph
+    ) -> None:
         """Test status endpoint with readonly API key."""
-        mock_execute.return_value = MOCK_CEPH_STATUS
+        stub_ceph.returns["mon_command"] = MOCK_CEPH_STATUS
 
-        response = client.get(
-            "/api/v1/cluster/status",
-            headers={"X-API-Key": "readonly-key"},
-        )
+        response = readonly_client.get("/api/v1/cluster/status")
 
         assert response.status_code == 200
-        data = response.json()
+        data = jbody(response)
         assert data["status"] == "success"
 
+    def test_get_status_cluster_unavailable(
+        self, admin_client: TestClient, stub_ceph: StubCeph
+    ) -> None:
+        """Test that a timed out Ceph command is reported as unavailable."""
+        stub_ceph.returns["mon_command"] = CephCommandFailedError(
+            command="ceph status --format json",
+            exit_code=-1,
+            stderr="Command timed out after 30 seconds",
+            unavailable=True,
+        )
+
+        response = admin_client.get("/api/v1/cluster/status")
+
+        data = jbody(response)
+        assert data["status"] == "error"
+        assert data["code"] == "CEPH_UNAVAILABLE"
+
 
 class TestClusterDfEndpoint:
     """Tests for /df endpoint."""
 
-    @patch("app.services.ceph_client.ceph_client.get_cluster_df")
-    def test_get_df_success(self, mock_get_df: MagicMock) -> None:
+    def test_get_df_success(self, mock_ceph: MagicMock) -> None:
         """Test successful retrieval of cluster df."""
-        mock_get_df.return_value = MOCK_CEPH_DF
+        mock_ceph.get_cluster_df.return_value = MOCK_CEPH_DF
 
-        response = client.get(
-            "/api/v1/cluster/df",
-            headers={"X-API-Key": "admin-key"},
-        )
+        response = asyncio.run(cluster.get_cluster_df(request=None, auth=ADMIN_AUTH))
 
         assert response.status_code == 200
-        data = response.json()
+        data = orjson.loads(response.body)
         assert data["status"] == "success"
         assert "data" in data
 
@@ -220,28 +242,169 @@ class TestClusterDfEndpoint:
         assert pool["stats"]["stored"] == 1073741824
         assert pool["stats"]["objects"] == 1024
 
-    @patch("app.services.ceph_client.ceph_client.get_cluster_df")
-    def test_get_df_caching(self, mock_get_df: MagicMock) -> None:
+    def test_get_df_caching(self, admin_client: TestClient, mock_ceph: MagicMock) -> None:
         """Test that df results are cached."""
-        mock_get_df.return_value = MOCK_CEPH_DF
+        mock_ceph.get_cluster_df.return_value = MOCK_CEPH_DF
 
-        # First request
-        response1 = client.get(
-            "/api/v1/cluster/df",
-            headers={"X-API-Key": "admin-key"},
-        )
-        assert response1.status_code == 200
+        # The second request is served from the cache
+        bodies = []
+        for _ in range(2):
+            response = admin_client.get("/api/v1/cluster/df")
+            assert response.status_code == 200
+            bodies.append(response.content)
 
-        # Second request should use cache
-        response2 = client.get(
+        mock_ceph.get_cluster_df.assert_called_once()
+        assert bodies[0] == bodies[1]
+
+    def test_get_df_etag_not_modified(self, admin_client: TestClient, mock_ceph: MagicMock) -> None:
+        """Test that a matching If-None-Match returns 304 with no body."""
+        mock_ceph.get_cluster_df.return_value = MOCK_CEPH_DF
+
+        response1 = admin_client.get("/api/v1/cluster/df")
+        etag = response1.headers["etag"]
+        assert response1.headers["cache-control"].startswith("private, max-age=")
+        assert response1.headers["vary"] == "X-API-Key"
+
+        response2 = admin_client.get(
             "/api/v1/cluster/df",
-            headers={"X-API-Key": "admin-key"},
+            headers={"If-None-Match": etag},
         )
-        assert response2.status_code == 200
+        assert response2.status_code == 304
+        assert response2.content == b""
+        assert response2.headers["etag"] == etag
+        assert response2.headers["cache-control"].startswith("private, max-age=")
+        assert response2.headers["vary"] == "X-API-Key"
+
+    def test_get_df_served_from_background_refresh(
+        self, readonly_client: TestClient, mock_ceph: MagicMock
+    ) -> None:
+        """Test that a background refresh makes the next request a cache hit."""
+        mock_ceph.get_cluster_df.return_value = MOCK_CEPH_DF
+
+        with patch("app.routers.cluster.audit_logger") as mock_audit:
+            asyncio.run(
+                cluster.get_cluster_df.refresh(request=None, auth=cluster._REFRESH_AUTH)
+            )
+            # Background refreshes are not audited
+            mock_audit.log_operation.assert_not_called()
+
+            # The user's read is a cache hit, and is audited as one
+            response = readonly_client.get("/api/v1/cluster/df")
+            mock_audit.log_operation.assert_called_once_with(
+                operation="READ",
+                resource="cluster:df",
+                user="readonly",
+                status="SUCCESS",
+                details={"cached": True},
+            )
+
+        assert response.status_code == 200
+        assert jbody(response)["data"]["stats"]["total_bytes"] == 1099511627776
+        assert mock_ceph.get_cluster_df.call_count == 1
+
+    def test_get_df_errors_not_cached(self, admin_client: TestClient, mock_ceph: MagicMock) -> None:
+        """Test that failed df lookups are retried on the next request."""
+        mock_ceph.get_cluster_df.side_effect = [RuntimeError("boom"), MOCK_CEPH_DF]
+
+        response1 = admin_client.get("/api/v1/cluster/df")
+        assert jbody(response1)["status"] == "error"
+
+        response2 = admin_client.get("/api/v1/cluster/df")
+        assert jbody(response2)["status"] == "success"
+        assert mock_ceph.get_cluster_df.call_count == 2
+
+class TestTTLCache:
+    """Tests for the ttl_cache decorator."""
+
+    def test_concurrent_misses_refresh_once(self) -> None:
+        """Test that concurrent cache misses share a single refresh."""
+        calls = 0
+
+        @ttl_cache(ttl_seconds=30)
+        async def endpoint() -> Response:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return Response(content=b"{}", media_type="application/json")
+
+        async def run() -> list:
+            return await asyncio.gather(*(endpoint() for _ in range(5)))
+
+        responses = asyncio.run(run())
+
+        assert calls == 1
+        assert all(r.body == b"{}" for r in responses)
+
+    def test_shared_cache_hit_skips_refresh(self) -> None:
+        """Test that a body cached by another worker is served without a refresh."""
+        calls = 0
+
+        class SharedCache:
+            def __init__(self) -> None:
+                self.store: dict = {}
+
+            async def get(self, key: str):
+                return self.store.get(key)
+
+            async def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+                self.store[key] = (value, ttl_seconds)
+
+        @ttl_cache(ttl_seconds=30)
+        async def endpoint() -> Response:
+            nonlocal calls
+            calls += 1
+            return Response(content=b'{"n": 1}', media_type="application/json")
+
+        shared = SharedCache()
+        with patch("app.routers.cluster.get_shared_cache", return_value=shared):
+            asyncio.run(endpoint())
+            # Simulate another worker with an empty local cache
+            _cache.clear()
+            response = asyncio.run(endpoint())
+
+        assert calls == 1
+        assert response.body == b'{"n": 1}'
+
+    def test_refresh_reuses_fresh_shared_entry(self) -> None:
+        """Test that a refresh skips Ceph while another worker's entry is fresh."""
+        calls = 0
+
+        @ttl_cache(ttl_seconds=30)
+        async def endpoint() -> Response:
+            nonlocal calls
+            calls += 1
+            return Response(content=b'{"n": 1}', media_type="application/json")
+
+        shared = MagicMock()
+        shared.get = AsyncMock(return_value=(b'{"n": 0}', 25.0))
+        shared.set = AsyncMock()
+        with patch("app.routers.cluster.get_shared_cache", return_value=shared):
+            asyncio.run(endpoint.refresh())
+            assert calls == 0
+            assert asyncio.run(endpoint()).body == b'{"n": 0}'
+
+            # Less than half the TTL left: this worker refreshes it
+            shared.get.return_value = (b'{"n": 0}', 5.0)
+            asyncio.run(endpoint.refresh())
+
+        assert calls == 1
+        shared.set.assert_called_once_with(ANY, b'{"n": 1}', 30)
+
+    def test_cache_is_bounded(self) -> None:
+        """Test that the least recently used entries are evicted."""
+
+        @ttl_cache(ttl_seconds=30)
+        async def endpoint(key: int) -> Response:
+            return Response(content=b"{}", media_type="application/json")
+
+        async def run() -> None:
+            for key in range(cluster._CACHE_MAX_ENTRIES + 10):
+                await endpoint(key=key)
+
+        asyncio.run(run())
 
-        # Should only call the mock once (second call uses cache)
-        # Note: This might be called more than once if cache is cleared between tests
-        assert mock_get_df.call_count >= 1
+        assert len(_cache) == cluster._CACHE_MAX_ENTRIES
+        assert not any("key', 0)" in k for k in _cache)
 
 
 if __name__ == "__main__":
@@ -1,14 +1,18 @@
 """Tests for filesystem endpoints."""
 
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 
 import pytest
 from fastapi.testclient import TestClient
 
-from app.core.exceptions import FilesystemNotFoundError
-from app.main import app
+from app.services.ceph_cache import ceph_read_cache
+from tests.conftest import asgi_get, jbody
 
-client = TestClient(app)
+
+@pytest.fixture(autouse=True)
+def _clear_read_cache() -> None:
+    """Clear the Ceph read cache so each test sees its own mocked data."""
+    ceph_read_cache.clear()
 
 
 class TestFilesystemEndpoints:
@@ -16,56 +20,54 @@ class TestFilesystemEndpoints:
 
     def test_health_check(self) -> None:
         """Test health check endpoint."""
-        response = client.get("/health")
+        response = asgi_get("/health")
         assert response.status_code == 200
-        assert response.json() == {"status": "healthy"}
+        assert jbody(response) == {"status": "healthy"}
 
-    @patch("app.services.ceph_client.ceph_client")
-    def test_create_filesystem_success(self, mock_client: MagicMock) -> None:
+    def test_create_filesystem_success(
+        self, admin_client: TestClient, mock_ceph: MagicMock
+    ) -> None:
         """Test successful filesystem creation."""
         # Setup mocks
-        mock_client.filesystem_exists.return_value = False
-        mock_client.crush_rule_exists.return_value = True
-        mock_client.pool_exists.return_value = False
-        mock_client.authorize_filesystem_client.return_value = "AQBkey123=="
+        mock_ceph.filesystem_exists.return_value = False
+        mock_ceph.crush_rule_exists.return_value = True
+        mock_ceph.list_pool_names.return_value = []
+        mock_ceph.authorize_filesystem_client.return_value = "AQBkey123=="
 
-        response = client.post(
+        response = admin_client.post(
             "/api/v1/fs/fs",
             json={
                 "name": "testfs",
                 "crush_rule": "replicated_mach2",
                 "meta_pool_pg": 16,
             },
-            headers={"X-API-Key": "admin-key"},
         )
 
         assert response.status_code == 201
-        data = response.json()
+        data = jbody(response)
         assert data["status"] == "success"
         assert data["data"]["name"] == "testfs"
         assert data["data"]["auth_created"] is True
 
-    @patch("app.services.ceph_client.ceph_client")
-    def test_create_filesystem_already_exists(self, mock_client: MagicMock) -> None:
+    def test_create_filesystem_already_exists(
+        self, admin_client: TestClient, mock_ceph: MagicMock
+    ) -> None:
         """Test filesystem creation when it already exists."""
-        mock_client.filesystem_exists.return_value = True
+        mock_ceph.filesystem_exists.return_value = True
 
-        response = client.post(
+        response = admin_client.post(
             "/api/v1/fs/fs",
             json={"name": "testfs"},
-            headers={"X-API-Key": "admin-key"},
         )
 
         assert response.status_code == 409
-        data = response.json()
+        data = jbody(response)
         assert data["status"] == "error"
         assert data["code"] == "FS_ALREADY_EXISTS"
 
-    @patch("app.services.ceph_client.ceph_client")
-    def test_get_filesystem(self, mock_client: MagicMock) -> None:
+    def test_get_filesystem(self, readonly_client: TestClient, mock_ceph: MagicMock) -> None:
         """Test getting filesystem info."""
-        mock_client.get_filesystem_info.return_value = {"name": "testfs"}
-        mock_client.list_filesystems.return_value = [
+        mock_ceph.list_filesystems.return_value = [
             {
                 "name": "testfs",
                 "metadata_pool": "cephfs.testfs.meta",
@@ -74,35 +76,29 @@ class TestFilesystemEndpoints:
             }
         ]
 
-        response = client.get(
-            "/api/v1/fs/fs/testfs",
-            headers={"X-API-Key": "readonly-key"},
-        )
+        response = readonly_client.get("/api/v1/fs/fs/testfs")
 
         assert response.status_code == 200
-        data = response.json()
+        data = jbody(response)
         assert data["status"] == "success"
         assert data["data"]["name"] == "testfs"
 
-    @patch("app.services.ceph_client.ceph_client")
-    def test_get_filesystem_not_found(self, mock_client: MagicMock) -> None:
+    def test_get_filesystem_not_found(
+        self, readonly_client: TestClient, mock_ceph: MagicMock
+    ) -> None:
         """Test getting non-existent filesystem."""
-        mock_client.get_filesystem_info.side_effect = FilesystemNotFoundError("testfs")
+        mock_ceph.list_filesystems.return_value = []
 
-        response = client.get(
-            "/api/v1/fs/fs/testfs",
-            headers={"X-API-Key": "readonly-key"},
-        )
+        response = readonly_client.get("/api/v1/fs/fs/testfs")
 
         assert response.status_code == 404
-        data = response.json()
+        data = jbody(response)
         assert data["status"] == "error"
         assert data["code"] == "FS_NOT_FOUND"
 
-    @patch("app.services.ceph_client.ceph_client")
-    def test_list_filesystems(self, mock_client: MagicMock) -> None:
+    def test_list_filesystems(self, readonly_client: TestClient, mock_ceph: MagicMock) -> None:
         """Test listing filesystems."""
-        mock_client.list_filesystems.return_value = [
+        mock_ceph.list_filesystems.return_value = [
             {
                 "name": "testfs1",
                 "metadata_pool": "cephfs.testfs1.meta",
@@ -117,62 +113,64 @@ class TestFilesystemEndpoints:
             },
         ]
 
-        response = client.get(
-            "/api/v1/fs/fs",
-            headers={"X-API-Key": "readonly-key"},
-        )
+        response = readonly_client.get("/api/v1/fs/fs")
 
         assert response.status_code == 200
-        data = response.json()
+        data = jbody(response)
         assert data["status"] == "success"
         assert data["data"]["count"] == 2
         assert len(data["data"]["filesystems"]) == 2
 
-    @patch("app.services.ceph_client.ceph_client")
-    def test_delete_filesystem_success(self, mock_client: MagicMock) -> None:
+    def test_delete_filesystem_success(
+        self, admin_client: TestClient, mock_ceph: MagicMock
+    ) -> None:
         """Test successful filesystem deletion."""
-        mock_client.filesystem_exists.return_value = True
+        mock_ceph.filesystem_exists.return_value = True
 
-        response = client.delete(
-            "/api/v1/fs/fs/testfs?confirm=testfs",
-            headers={"X-API-Key": "admin-key"},
-        )
+        response = admin_client.delete("/api/v1/fs/fs/testfs?confirm=testfs")
 
         assert response.status_code == 204
 
-    @patch("app.services.ceph_client.ceph_client")
     def test_delete_filesystem_confirmation_required(
-        self, mock_client: MagicMock
+        self, admin_client: TestClient, mock_ceph: MagicMock
     ) -> None:
         """Test filesystem deletion without proper confirmation."""
-        response = client.delete(
-            "/api/v1/fs/fs/testfs?confirm=wrong",
-            headers={"X-API-Key": "admin-key"},
-        )
+        response = admin_client.delete("/api/v1/fs/fs/testfs?confirm=wrong")
 
         assert response.status_code == 400
-        data = response.json()
+        data = jbody(response)
         assert data["status"] == "error"
         assert data["code"] == "CONFIRMATION_REQUIRED"
 
     def test_unauthorized_access(self) -> None:
         """Test unauthorized access without API key."""
-        response = client.get("/api/v1/fs/fs")
+        response = asgi_get("/api/v1/fs/fs")
 
         assert response.status_code == 401
-        data = response.json()
+        data = jbody(response)
         assert data["status"] == "error"
         assert data["code"] == "INVALID_API_KEY"
 
-    def test_insufficient_permissions(self) -> None:
-        """Test access with insufficient permissions."""
+    @pytest.mark.parametrize(
+        "headers,status_code,code",
+        [
+            (None, 401, "INVALID_API_KEY"),
+            ({"X-API-Key": "invalid-key"}, 401, "INVALID_API_KEY"),
+            ({"X-API-Key": "readonly-key"}, 403, "PERMISSION_DENIED"),
+        ],
+        ids=["no_api_key", "invalid_api_key", "insufficient_permissions"],
+    )
+    def test_create_filesystem_auth_failure(
+        self, client: TestClient, headers: dict, status_code: int, code: str
+    ) -> None:
+        """Test that filesystem creation rejects missing, invalid, or read-only keys."""
         response = client.post(
             "/api/v1/fs/fs",
             json={"name": "testfs"},
-            headers={"X-API-Key": "readonly-key"},
+            headers=headers,
         )
 
-        assert response.status_code == 403
-        data = response.json()
+        assert response.status_code == status_code
+        data = jbody(response)
         assert data["status"] == "error"
-        assert data["code"] == "PERMISSION_DENIED"
+        assert data["code"] == code
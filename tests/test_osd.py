@@ -1,202 +1,233 @@
 """Tests for OSD endpoints."""
 
+from types import MappingProxyType
+from typing import Any, Iterator, List, Mapping
 from unittest.mock import MagicMock, patch
 
+import httpx
 import pytest
 from fastapi.testclient import TestClient
 
-from main import app
+from app.core.exceptions import CephCommandFailedError
+from app.routers.osd import _OSD_FLAG_COMMANDS
+from app.services.ceph_cache import ceph_read_cache
+from tests.conftest import jbody
+
+
+# Mock ceph osd dump response (trimmed to relevant fields). Read-only, since
+# the router caches the entries it is handed across requests.
+MOCK_OSD_DUMP = MappingProxyType({
+    "osds": tuple(
+        MappingProxyType(osd)
+        for osd in (
+            {"osd": 0, "up": 1, "in": 1, "weight": 1.0},
+            {"osd": 1, "up": 1, "in": 1, "weight": 1.0},
+            {"osd": 285, "up": 1, "in": 0, "weight": 0.0},
+            {"osd": 286, "up": 0, "in": 0, "weight": 0.0},
+        )
+    ),
+})
 
-client = TestClient(app)
+# The same entries indexed by id, as the router keeps the cached dump
+MOCK_OSDS_BY_ID = {osd["osd"]: osd for osd in MOCK_OSD_DUMP["osds"]}
 
-# Mock ceph osd dump response (trimmed to relevant fields)
-MOCK_OSD_DUMP = {
-    "osds": [
-        {"osd": 0, "up": 1, "in": 1, "weight": 1.0},
-        {"osd": 1, "up": 1, "in": 1, "weight": 1.0},
-        {"osd": 285, "up": 1, "in": 0, "weight": 0.0},
-        {"osd": 286, "up": 0, "in": 0, "weight": 0.0},
-    ],
-}
 
+def assert_osd_status(response: httpx.Response, osd: int, up: int, in_: int) -> None:
+    """Assert a successful OSD status response reporting the given state."""
+    assert response.status_code == 200
+    body = jbody(response)
+    assert body["status"] == "success"
+    assert (body["data"]["osd"], body["data"]["up"], body["data"]["in"]) == (osd, up, in_)
 
-class TestOSDStatusEndpoint:
-    """Tests for GET /ceph/osd/{osd_id}/status."""
 
-    @patch("app.services.ceph_client.ceph_client.execute_command")
-    def test_get_osd_status_up_in(self, mock_execute: MagicMock) -> None:
-        """Test getting status of an OSD that is up and in."""
-        mock_execute.return_value = MOCK_OSD_DUMP
+def _mock_ceph(command: List[str], **kwargs: Any) -> Mapping[str, Any]:
+    """Answer 'osd info' and 'osd dump' from MOCK_OSD_DUMP."""
+    if command[:2] == ["osd", "info"]:
+        osd = MOCK_OSDS_BY_ID.get(int(command[2].removeprefix("osd.")))
+        if osd is None:
+            raise CephCommandFailedError(
+                command="ceph osd info", exit_code=2, stderr="does not exist"
+            )
+        return osd
+    return MOCK_OSD_DUMP
 
-        response = client.get(
-            "/api/v1/ceph/osd/0/status",
-            headers={"X-API-Key": "admin-key"},
-        )
 
-        assert response.status_code == 200
-        data = response.json()
-        assert data["status"] == "success"
-        assert data["data"]["osd"] == 0
-        assert data["data"]["up"] == 1
-        assert data["data"]["in"] == 1
-
-    @patch("app.services.ceph_client.ceph_client.execute_command")
-    def test_get_osd_status_up_out(self, mock_execute: MagicMock) -> None:
-        """Test getting status of an OSD that is up but out."""
-        mock_execute.return_value = MOCK_OSD_DUMP
-
-        response = client.get(
-            "/api/v1/ceph/osd/285/status",
-            headers={"X-API-Key": "admin-key"},
-        )
+@pytest.fixture(autouse=True)
+def _clear_read_cache() -> None:
+    """Clear the Ceph read cache so each test sees its own mocked dump."""
+    ceph_read_cache.clear()
 
-        assert response.status_code == 200
-        data = response.json()
-        assert data["data"]["osd"] == 285
-        assert data["data"]["up"] == 1
-        assert data["data"]["in"] == 0
-
-    @patch("app.services.ceph_client.ceph_client.execute_command")
-    def test_get_osd_status_down_out(self, mock_execute: MagicMock) -> None:
-        """Test getting status of an OSD that is down and out."""
-        mock_execute.return_value = MOCK_OSD_DUMP
-
-        response = client.get(
-            "/api/v1/ceph/osd/286/status",
-            headers={"X-API-Key": "admin-key"},
-        )
 
-        assert response.status_code == 200
-        data = response.json()
-        assert data["data"]["osd"] == 286
-        assert data["data"]["up"] == 0
-        assert data["data"]["in"] == 0
+class TestOSDStatusEndpoint:
+    """Tests for GET /ceph/osd/{osd_id}/status."""
 
-    @patch("app.services.ceph_client.ceph_client.execute_command")
-    def test_get_osd_status_not_found(self, mock_execute: MagicMock) -> None:
+    @pytest.fixture(autouse=True)
+    def _patch_execute(self) -> Iterator[MagicMock]:
+        """Answer Ceph commands from MOCK_OSD_DUMP in every test."""
+        with patch("app.services.ceph_client.ceph_client.execute_command") as mock_execute:
+            mock_execute.side_effect = _mock_ceph
+            self.mock_execute = mock_execute
+            yield mock_execute
+
+    @pytest.mark.parametrize(
+        "osd_id,up,in_",
+        [
+            (0, 1, 1),  # up and in
+            (285, 1, 0),  # up but out
+            (286, 0, 0),  # down and out
+        ],
+    )
+    @pytest.mark.asyncio
+    async def test_get_osd_status(
+        self, aclient: httpx.AsyncClient, osd_id: int, up: int, in_: int
+    ) -> None:
+        """Test getting the up/in status of an OSD."""
+        response = await aclient.get(f"/api/v1/ceph/osd/{osd_id}/status")
+
+        assert_osd_status(response, osd_id, up, in_)
+
+    @pytest.mark.asyncio
+    async def test_get_osd_status_not_found(self, aclient: httpx.AsyncClient) -> None:
         """Test getting status of a non-existent OSD returns 404."""
-        mock_execute.return_value = MOCK_OSD_DUMP
-
-        response = client.get(
-            "/api/v1/ceph/osd/9999/status",
-            headers={"X-API-Key": "admin-key"},
-        )
+        response = await aclient.get("/api/v1/ceph/osd/9999/status")
 
         assert response.status_code == 404
-        data = response.json()
+        data = jbody(response)
         assert data["status"] == "error"
         assert data["code"] == "OSD_NOT_FOUND"
 
-    @patch("app.services.ceph_client.ceph_client.execute_command")
-    def test_get_osd_status_readonly_key(self, mock_execute: MagicMock) -> None:
-        """Test OSD status with readonly key (has osd:read)."""
-        mock_execute.return_value = MOCK_OSD_DUMP
+    @pytest.mark.asyncio
+    async def test_get_osd_status_queries_single_osd(self, aclient: httpx.AsyncClient) -> None:
+        """Test that a lookup queries only the requested OSD."""
+        response = await aclient.get("/api/v1/ceph/osd/285/status")
+
+        assert response.status_code == 200
+        self.mock_execute.assert_called_once()
+        assert self.mock_execute.call_args[0][0][:3] == ["osd", "info", "osd.285"]
 
-        response = client.get(
-            "/api/v1/ceph/osd/0/status",
-            headers={"X-API-Key": "readonly-key"},
+    @pytest.mark.asyncio
+    async def test_get_osd_status_falls_back_to_osd_dump(self, aclient: httpx.AsyncClient) -> None:
+        """Test that lookups fall back to a shared osd dump without 'osd info'."""
+
+        def without_osd_info(command: List[str], **kwargs: Any) -> Mapping[str, Any]:
+            if command[:2] == ["osd", "info"]:
+                raise CephCommandFailedError(
+                    command="ceph osd info", exit_code=22, stderr="invalid command"
+                )
+            return MOCK_OSD_DUMP
+
+        self.mock_execute.side_effect = without_osd_info
+
+        for osd_id in (0, 285):
+            response = await aclient.get(f"/api/v1/ceph/osd/{osd_id}/status")
+            assert response.status_code == 200
+
+        assert jbody(response)["data"]["in"] == 0
+        dump_calls = [c for c in self.mock_execute.call_args_list if c[0][0][:2] == ["osd", "dump"]]
+        assert len(dump_calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_get_osd_status_readonly_key(self, aclient: httpx.AsyncClient) -> None:
+        """Test OSD status with readonly key (has osd:read)."""
+        response = await aclient.get(
+            "/api/v1/ceph/osd/0/status", headers={"X-API-Key": "readonly-key"}
         )
 
         assert response.status_code == 200
 
-    def test_get_osd_status_no_api_key(self) -> None:
+    def test_get_osd_status_no_api_key(self, client: TestClient) -> None:
         """Test OSD status without API key."""
         response = client.get("/api/v1/ceph/osd/0/status")
 
         assert response.status_code == 401
-        data = response.json()
+        data = jbody(response)
         assert data["code"] == "INVALID_API_KEY"
 
 
 class TestOSDFlagEndpoint:
     """Tests for POST /ceph/osd/flags."""
 
-    @patch("app.services.ceph_client.ceph_client.execute_command")
-    def test_set_noout(self, mock_execute: MagicMock) -> None:
-        """Test setting noout flag."""
-        mock_execute.return_value = "noout is set"
+    @pytest.fixture(autouse=True)
+    def _patch_execute(self) -> Iterator[MagicMock]:
+        """Patch the Ceph command runner to echo the flag change like ceph does."""
+        with patch("app.services.ceph_client.ceph_client.execute_command") as mock_execute:
+            mock_execute.side_effect = lambda command, **kwargs: f"{command[2]} is {command[1]}"
+            self.mock_execute = mock_execute
+            yield mock_execute
 
-        response = client.post(
+    def test_set_noout(self, admin_client: TestClient) -> None:
+        """Test setting noout flag."""
+        response = admin_client.post(
             "/api/v1/ceph/osd/flags",
-            headers={"X-API-Key": "admin-key"},
             json={"flag": "noout", "action": "set"},
         )
 
         assert response.status_code == 200
-        data = response.json()
+        data = jbody(response)
         assert data["status"] == "success"
         assert data["data"]["ok"] is True
         assert "noout" in data["data"]["message"]
-        mock_execute.assert_called_once_with(["osd", "set", "noout"])
+        self.mock_execute.assert_called_once_with(["osd", "set", "noout"])
+        # The prebuilt command is passed as-is, not rebuilt per request
+        assert self.mock_execute.call_args[0][0] is _OSD_FLAG_COMMANDS[("noout", "set")]
 
-    @patch("app.services.ceph_client.ceph_client.execute_command")
-    def test_unset_noout(self, mock_execute: MagicMock) -> None:
+    def test_unset_noout(self, admin_client: TestClient) -> None:
         """Test unsetting noout flag."""
-        mock_execute.return_value = "noout is unset"
-
-        response = client.post(
+        response = admin_client.post(
             "/api/v1/ceph/osd/flags",
-            headers={"X-API-Key": "admin-key"},
             json={"flag": "noout", "action": "unset"},
         )
 
         assert response.status_code == 200
-        data = response.json()
+        data = jbody(response)
         assert data["data"]["ok"] is True
-        mock_execute.assert_called_once_with(["osd", "unset", "noout"])
+        self.mock_execute.assert_called_once_with(["osd", "unset", "noout"])
 
-    @patch("app.services.ceph_client.ceph_client.execute_command")
-    def test_set_norebalance(self, mock_execute: MagicMock) -> None:
+    def test_set_norebalance(self, admin_client: TestClient) -> None:
         """Test setting norebalance flag."""
-        mock_execute.return_value = "norebalance is set"
-
-        response = client.post(
+        response = admin_client.post(
             "/api/v1/ceph/osd/flags",
-            headers={"X-API-Key": "admin-key"},
             json={"flag": "norebalance", "action": "set"},
         )
 
         assert response.status_code == 200
-        data = response.json()
+        data = jbody(response)
         assert data["data"]["ok"] is True
-        mock_execute.assert_called_once_with(["osd", "set", "norebalance"])
+        self.mock_execute.assert_called_once_with(["osd", "set", "norebalance"])
 
-    def test_invalid_flag_rejected(self) -> None:
+    def test_invalid_flag_rejected(self, admin_client: TestClient) -> None:
         """Test that disallowed flags are rejected at validation."""
-        response = client.post(
+        response = admin_client.post(
             "/api/v1/ceph/osd/flags",
-            headers={"X-API-Key": "admin-key"},
             json={"flag": "noup", "action": "set"},
         )
 
         assert response.status_code == 422
-        data = response.json()
+        data = jbody(response)
         assert data["status"] == "error"
         assert data["code"] == "VALIDATION_ERROR"
 
-    def test_invalid_action_rejected(self) -> None:
+    def test_invalid_action_rejected(self, admin_client: TestClient) -> None:
         """Test that invalid actions are rejected."""
-        response = client.post(
+        response = admin_client.post(
             "/api/v1/ceph/osd/flags",
-            headers={"X-API-Key": "admin-key"},
             json={"flag": "noout", "action": "toggle"},
         )
 
         assert response.status_code == 422
 
-    def test_flag_requires_write_permission(self) -> None:
+    def test_flag_requires_write_permission(self, readonly_client: TestClient) -> None:
         """Test that readonly key cannot set flags."""
-        response = client.post(
+        response = readonly_client.post(
             "/api/v1/ceph/osd/flags",
-            headers={"X-API-Key": "readonly-key"},
             json={"flag": "noout", "action": "set"},
         )
 
         assert response.status_code == 403
-        data = response.json()
+        data = jbody(response)
         assert data["code"] == "PERMISSION_DENIED"
 
-    def test_flag_no_api_key(self) -> None:
+    def test_flag_no_api_key(self, client: TestClient) -> None:
         """Test flag endpoint without API key."""
         response = client.post(
             "/api/v1/ceph/osd/flags",
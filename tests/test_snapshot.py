@@ -1,37 +1,72 @@
 """Unit tests for snapshot schedule endpoints."""
 
-import json
-from unittest.mock import AsyncMock, MagicMock, patch
-
+import orjson
 import pytest
-from fastapi import status
+from fastapi import FastAPI, status
 from fastapi.testclient import TestClient
+from pydantic import ValidationError
 
 from app.ceph import CephFsNotFound, CephScheduleNotFound
 from app.models.snapshot import AddSnapshotScheduleRequest
-
-
+from app.routers import snapshot
+from app.routers.snapshot import (
+    _map_retention_unit,
+    add_snapshot_schedule,
+    get_snapshot_schedules,
+    list_snapshots,
+    remove_snapshot_schedule,
+)
+
+# Exact body of a successful add with start time and retention
+EXPECTED_ADD_OK = orjson.dumps({
+    "status": "success",
+    "data": {
+        "path": "/data",
+        "schedule": "1d",
+        "start_time": "02:00:00",
+        "retention": {"daily": 7, "weekly": 4},
+        "fs_name": "cephfs",
+        "message": "Snapshot schedule added successfully",
+    },
+})
+
+
+# One event loop for the whole class instead of one per test
+@pytest.mark.asyncio(scope="class")
 class TestSnapshotScheduleEndpoints:
     """Test cases for snapshot schedule management."""
 
     @pytest.fixture
-    def mock_ceph_client(self):
-        """Mock CephClient for testing."""
-        with patch("app.routers.snapshot.CephClient") as mock:
-            instance = mock.return_value
-            instance.execute = AsyncMock()
-            instance.fs_exists = AsyncMock(return_value=True)
-            yield instance
+    def mock_ceph_client(self, mock_ceph):
+        """Mock ceph_client with the filesystem present.
 
-    @pytest.mark.asyncio
-    async def test_add_snapshot_schedule_success(self, mock_ceph_client):
-        """Test successful snapshot schedule creation."""
-        # Arrange
-        mock_ceph_client.execute.return_value = ""
+        Builds on the session autospec from conftest, which is reset for each
+        test, so the client is patched without creating new mocks per test.
+        Streamed output is served from ``execute_command``'s return value.
+        """
+
+        async def stream(command):
+            for item in await mock_ceph.execute_command(command) or []:
+                yield item
+
+        mock_ceph.filesystem_exists.return_value = True
+        mock_ceph.execute_command_stream.side_effect = stream
+        return mock_ceph
+
+    @pytest.fixture
+    def executed(self, mock_ceph_client):
+        """Commands run through ``execute_command``, in call order."""
+        commands = []
+
+        async def record(command, **kwargs):
+            commands.append(command)
+            return ""
 
-        # Import here to avoid circular imports
-        from app.routers.snapshot import add_snapshot_schedule
+        mock_ceph_client.execute_command.side_effect = record
+        return commands
 
+    async def test_add_snapshot_schedule_success(self, executed):
+        """Test successful snapshot schedule creation."""
         request = AddSnapshotScheduleRequest(
             path="/data",
             schedule="1d",
@@ -44,25 +79,21 @@ class TestSnapshotScheduleEndpoints:
 
         # Assert
         assert response.status_code == status.HTTP_201_CREATED
-        body = json.loads(response.body)
-        assert body["status"] == "success"
-        assert body["data"]["schedule"] == "1d"
-        assert body["data"]["path"] == "/data"
+        assert response.body == EXPECTED_ADD_OK
 
         # Verify commands executed
-        calls = mock_ceph_client.execute.call_args_list
-        assert len(calls) == 3  # 1 add + 2 retention policies
+        assert len(executed) == 2  # 1 add + 1 compound retention policy
 
         # Check main schedule command
-        assert calls[0][0][0] == ["fs", "snap-schedule", "add", "/data", "1d", "02:00:00", "--fs", "cephfs"]
+        assert executed[0] == ["fs", "snap-schedule", "add", "/data", "1d", "02:00:00", "--fs", "cephfs"]
+        assert executed[1] == [
+            "fs", "snap-schedule", "retention", "add", "/data", "7d4w", "--fs", "cephfs",
+        ]
 
-    @pytest.mark.asyncio
     async def test_add_schedule_filesystem_not_found(self, mock_ceph_client):
         """Test schedule creation with non-existent filesystem."""
         # Arrange
-        mock_ceph_client.fs_exists.return_value = False
-
-        from app.routers.snapshot import add_snapshot_schedule
+        mock_ceph_client.filesystem_exists.return_value = False
 
         request = AddSnapshotScheduleRequest(path="/", schedule="1d")
 
@@ -71,15 +102,14 @@ class TestSnapshotScheduleEndpoints:
 
         # Assert
         assert response.status_code == status.HTTP_404_NOT_FOUND
-        body = json.loads(response.body)
+        body = orjson.loads(response.body)
         assert body["status"] == "error"
-        assert body["code"] == "CEPH_FS_NOT_FOUND"
+        assert body["code"] == "FS_NOT_FOUND"
 
-    @pytest.mark.asyncio
     async def test_get_snapshot_schedules_success(self, mock_ceph_client):
         """Test retrieving snapshot schedules."""
         # Arrange
-        mock_ceph_client.execute.return_value = [
+        mock_ceph_client.execute_command.return_value = [
             {
                 "path": "/",
                 "schedule": "1d",
@@ -89,44 +119,33 @@ class TestSnapshotScheduleEndpoints:
             }
         ]
 
-        from app.routers.snapshot import get_snapshot_schedules
-
         # Act
         response = await get_snapshot_schedules("cephfs", "/")
 
         # Assert
         assert response.status_code == status.HTTP_200_OK
-        body = json.loads(response.body)
+        body = orjson.loads(response.body)
         assert body["status"] == "success"
         assert body["data"]["count"] == 1
         assert body["data"]["schedules"][0]["schedule"] == "1d"
 
-    @pytest.mark.asyncio
     async def test_get_schedules_empty(self, mock_ceph_client):
         """Test retrieving schedules when none exist."""
         # Arrange
-        mock_ceph_client.execute.return_value = []
-
-        from app.routers.snapshot import get_snapshot_schedules
+        mock_ceph_client.execute_command.return_value = []
 
         # Act
         response = await get_snapshot_schedules("cephfs", "/")
 
         # Assert
         assert response.status_code == status.HTTP_200_OK
-        body = json.loads(response.body)
+        body = orjson.loads(response.body)
         assert body["status"] == "success"
         assert body["data"]["count"] == 0
         assert body["data"]["schedules"] == []
 
-    @pytest.mark.asyncio
-    async def test_remove_snapshot_schedule_success(self, mock_ceph_client):
+    async def test_remove_snapshot_schedule_success(self, executed):
         """Test successful schedule removal."""
-        # Arrange
-        mock_ceph_client.execute.return_value = ""
-
-        from app.routers.snapshot import remove_snapshot_schedule
-
         # Act
         response = await remove_snapshot_schedule("cephfs", "/", "1d")
 
@@ -134,17 +153,10 @@ class TestSnapshotScheduleEndpoints:
         assert response.status_code == status.HTTP_204_NO_CONTENT
 
         # Verify command
-        calls = mock_ceph_client.execute.call_args_list
-        assert calls[0][0][0] == ["fs", "snap-schedule", "remove", "/", "1d", "--fs", "cephfs"]
+        assert executed[0] == ["fs", "snap-schedule", "remove", "/", "1d", "--fs", "cephfs"]
 
-    @pytest.mark.asyncio
-    async def test_remove_all_schedules(self, mock_ceph_client):
+    async def test_remove_all_schedules(self, executed):
         """Test removing all schedules on a path."""
-        # Arrange
-        mock_ceph_client.execute.return_value = ""
-
-        from app.routers.snapshot import remove_snapshot_schedule
-
         # Act
         response = await remove_snapshot_schedule("cephfs", "/data", None)
 
@@ -152,80 +164,91 @@ class TestSnapshotScheduleEndpoints:
         assert response.status_code == status.HTTP_204_NO_CONTENT
 
         # Verify command (no schedule parameter)
-        calls = mock_ceph_client.execute.call_args_list
-        assert calls[0][0][0] == ["fs", "snap-schedule", "remove", "/data", "--fs", "cephfs"]
+        assert executed[0] == ["fs", "snap-schedule", "remove", "/data", "--fs", "cephfs"]
 
-    @pytest.mark.asyncio
     async def test_list_snapshots_not_implemented(self):
         """Test that snapshot listing returns 501."""
-        from app.routers.snapshot import list_snapshots
-
         # Act
         response = await list_snapshots("cephfs", "/", 100, False)
 
         # Assert
         assert response.status_code == status.HTTP_501_NOT_IMPLEMENTED
-        body = json.loads(response.body)
+        body = orjson.loads(response.body)
         assert body["status"] == "error"
         assert body["code"] == "NOT_IMPLEMENTED"
 
 
+# (value, expected to validate) tables for TestScheduleValidation
+SCHEDULE_CASES = [
+    ("1h", True),
+    ("6h", True),
+    ("1d", True),
+    ("2d", True),
+    ("1w", True),
+    ("1M", True),
+    ("1y", True),
+    ("24h", True),
+    ("1x", False),  # Invalid unit
+    ("h", False),  # Missing number
+    ("0d", False),  # Zero
+    ("-1d", False),  # Negative
+    ("1", False),  # Missing unit
+]
+
+PATH_CASES = [
+    ("/", True),
+    ("/data", True),
+    ("/data/users", True),
+    ("/data/users/john", True),
+    ("data", False),  # Doesn't start with /
+    ("/data/", False),  # Ends with /
+    ("//data", False),  # Double slash
+    ("/data//users", False),  # Double slash
+    ("/data\x00users", False),  # Null byte
+]
+
+
+def _validates(**fields) -> bool:
+    """Return whether AddSnapshotScheduleRequest accepts the given fields."""
+    try:
+        AddSnapshotScheduleRequest(**fields)
+    except ValidationError:
+        return False
+    return True
+
+
 class TestScheduleValidation:
-    """Test schedule format validation."""
-
-    @pytest.mark.parametrize(
-        "schedule,expected",
-        [
-            ("1h", True),
-            ("6h", True),
-            ("1d", True),
-            ("2d", True),
-            ("1w", True),
-            ("1M", True),
-            ("1y", True),
-            ("24h", True),
-            ("1x", False),  # Invalid unit
-            ("h", False),  # Missing number
-            ("0d", False),  # Zero
-            ("-1d", False),  # Negative
-            ("1", False),  # Missing unit
-        ],
-    )
-    def test_schedule_format_validation(self, schedule: str, expected: bool):
+    """Test schedule format validation.
+
+    The full tables are checked in one loop each; the parametrized tests
+    keep one valid and one invalid row reported individually.
+    """
+
+    def test_schedule_format_validation(self):
         """Test schedule format validation."""
-        from pydantic import ValidationError
-
-        try:
-            request = AddSnapshotScheduleRequest(schedule=schedule)
-            assert expected, f"Expected {schedule} to fail validation"
-            assert request.schedule == schedule
-        except ValidationError:
-            assert not expected, f"Expected {schedule} to pass validation"
-
-    @pytest.mark.parametrize(
-        "path,expected",
-        [
-            ("/", True),
-            ("/data", True),
-            ("/data/users", True),
-            ("/data/users/john", True),
-            ("data", False),  # Doesn't start with /
-            ("/data/", False),  # Ends with /
-            ("//data", False),  # Double slash
-            ("/data//users", False),  # Double slash
-            ("/data\x00users", False),  # Null byte
-        ],
-    )
-    def test_path_validation(self, path: str, expected: bool):
+        failures = [
+            schedule for schedule, expected in SCHEDULE_CASES
+            if _validates(schedule=schedule) != expected
+        ]
+        assert not failures, f"Unexpected validation result for {failures}"
+
+    def test_path_validation(self):
         """Test path format validation."""
-        from pydantic import ValidationError
+        failures = [
+            path for path, expected in PATH_CASES
+            if _validates(path=path, schedule="1d") != expected
+        ]
+        assert not failures, f"Unexpected validation result for {failures!r}"
+
+    @pytest.mark.parametrize("schedule,expected", [("1d", True), ("1x", False)])
+    def test_schedule_format_canary(self, schedule: str, expected: bool):
+        """Test one accepted and one rejected schedule."""
+        assert _validates(schedule=schedule) == expected
 
-        try:
-            request = AddSnapshotScheduleRequest(path=path, schedule="1d")
-            assert expected, f"Expected {path} to fail validation"
-            assert request.path == path
-        except ValidationError:
-            assert not expected, f"Expected {path} to pass validation"
+    @pytest.mark.parametrize("path,expected", [("/data", True), ("//data", False)])
+    def test_path_canary(self, path: str, expected: bool):
+        """Test one accepted and one rejected path."""
+        assert _validates(path=path, schedule="1d") == expected
 
 
 class TestRetentionMapping:
@@ -233,8 +256,6 @@ class TestRetentionMapping:
 
     def test_retention_unit_mapping(self):
         """Test mapping from API units to Ceph units."""
-        from app.routers.snapshot import _map_retention_unit
-
         assert _map_retention_unit("hourly") == "h"
         assert _map_retention_unit("daily") == "d"
         assert _map_retention_unit("weekly") == "w"
@@ -249,14 +270,14 @@ class TestErrorHandling:
     @pytest.mark.asyncio
     async def test_ceph_error_conversion(self):
         """Test CephCommandError to API response conversion."""
-        from app.ceph import CephFsNotFound
+        # Not hoisted: the router has no _handle_ceph_error
         from app.routers.snapshot import _handle_ceph_error
 
         error = CephFsNotFound("test-fs")
         response = _handle_ceph_error(error)
 
         assert response.status_code == status.HTTP_404_NOT_FOUND
-        body = json.loads(response.body)
+        body = orjson.loads(response.body)
         assert body["status"] == "error"
         assert body["code"] == "CEPH_FS_NOT_FOUND"
         assert "test-fs" in body["message"]
@@ -266,9 +287,6 @@ class TestErrorHandling:
 @pytest.fixture
 def client():
     """Create test client."""
-    from fastapi import FastAPI
-    from app.routers import snapshot
-
     app = FastAPI()
     app.include_router(snapshot.router, prefix="/api/v1")
 